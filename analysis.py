@@ -0,0 +1,167 @@
+"""Turn model outputs into the analysis returned by /predict.
+
+Shared by the server, the offline tools (``tools/bulk_scan.py``) and the
+benchmarks, so all of them produce identical results from the same label
+files and Gemini replies.
+"""
+import json
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def load_labels(path: str, kind: str) -> Optional[list]:
+    """Class names from a ``*_labels.json`` file, or None if it is missing or unreadable."""
+    if not os.path.exists(path):
+        logger.warning(f"{kind.capitalize()} labels not found at {path}")
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load {kind} labels: {e}")
+        return None
+    logger.info(f"✓ Loaded {len(labels)} {kind} labels")
+    return labels
+
+
+def create_dual_model_analysis(species_name: str, species_confidence: float, 
+                               disease_name: str, disease_confidence: float) -> dict:
+    """Analyze dual-model predictions (species + disease) and generate structured response."""
+    
+    # Round confidences
+    species_conf = round(float(species_confidence), 2)
+    disease_conf = round(float(disease_confidence), 2)
+    combined_conf = round((species_conf + disease_conf) / 2, 2)
+    
+    # Determine severity based on disease confidence
+    if disease_conf >= 70:
+        severity = 'High'
+    elif disease_conf >= 40:
+        severity = 'Medium'
+    else:
+        severity = 'Low'
+    
+    # Health score inversely proportional to disease confidence
+    health_score = max(0, 100 - int(disease_conf))
+    
+    # Check if it's a healthy condition or actual disease
+    disease_lower = disease_name.lower()
+    is_healthy = 'healthy' in disease_lower or 'normal' in disease_lower
+    
+    if is_healthy:
+        symptoms = []
+        recommendations = [
+            f'{species_name} appears healthy',
+            'Continue regular watering and care',
+            'Monitor periodically for any changes',
+            'Maintain good air circulation'
+        ]
+        disease_detected = False
+    else:
+        symptoms = [
+            'Disease symptoms detected',
+            'Visual abnormalities present',
+            f'Identified as {disease_name}'
+        ]
+        recommendations = [
+            f'Disease detected: {disease_name}',
+            'Isolate affected plant to prevent spread',
+            'Remove severely affected leaves',
+            'Apply appropriate fungicide or treatment',
+            'Monitor other plants for similar symptoms',
+            'Consult plant expert if condition worsens'
+        ]
+        disease_detected = True
+    
+    return {
+        'plantName': species_name,
+        'diseaseDetected': disease_detected,
+        'diseaseName': disease_name if disease_detected else None,
+        'confidence': combined_conf,
+        'speciesConfidence': species_conf,
+        'diseaseConfidence': disease_conf,
+        'severity': severity,
+        'symptoms': symptoms,
+        'recommendations': recommendations,
+        'healthScore': health_score,
+        'modelType': 'dual'  # Indicates this used both models
+    }
+
+
+def parse_ai_analysis(ai_text: str) -> dict | None:
+    """Parse structured AI response into analysis dict."""
+    try:
+        lines = ai_text.strip().split('\n')
+        parsed = {}
+        
+        for line in lines:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                key = key.strip().upper().replace('**', '')
+                value = value.strip().replace('**', '')
+                
+                if key == 'PLANT':
+                    parsed['plantName'] = value
+                elif key == 'DISEASE':
+                    if value.lower().startswith('yes'):
+                        parsed['diseaseDetected'] = True
+                        # Extract disease name after "Yes -" or "Yes,"
+                        disease_name = value.split('-', 1)[-1].split(',', 1)[-1].strip()
+                        parsed['diseaseName'] = disease_name if disease_name and disease_name.lower() != 'yes' else 'Disease Detected'
+                    else:
+                        parsed['diseaseDetected'] = False
+                        parsed['diseaseName'] = None
+                elif key == 'CONFIDENCE':
+                    try:
+                        conf_num = ''.join(filter(str.isdigit, value))
+                        parsed['confidence'] = float(conf_num) if conf_num else 50.0
+                    except:
+                        parsed['confidence'] = 50.0
+                elif key == 'SEVERITY':
+                    severity = value.strip().title()
+                    if severity in ['Low', 'Medium', 'High']:
+                        parsed['severity'] = severity
+                    else:
+                        parsed['severity'] = 'Medium'
+                elif key == 'SYMPTOMS':
+                    symptoms = [s.strip() for s in value.split('|') if s.strip()]
+                    parsed['symptoms'] = symptoms if symptoms else ['Visible symptoms present']
+                elif key == 'RECOMMENDATIONS':
+                    recommendations = [r.strip() for r in value.split('|') if r.strip()]
+                    parsed['recommendations'] = recommendations if recommendations else ['Consult plant expert']
+                elif key == 'ANALYSIS':
+                    parsed['aiAssist'] = value
+        
+        # Ensure required fields
+        if 'plantName' not in parsed:
+            parsed['plantName'] = 'Unknown Plant'
+        if 'diseaseDetected' not in parsed:
+            parsed['diseaseDetected'] = False
+        if 'confidence' not in parsed:
+            parsed['confidence'] = 50.0
+        if 'severity' not in parsed:
+            parsed['severity'] = 'Medium'
+        if 'symptoms' not in parsed:
+            parsed['symptoms'] = []
+        if 'recommendations' not in parsed:
+            parsed['recommendations'] = ['Monitor plant condition', 'Consult expert if symptoms worsen']
+        
+        # Calculate health score
+        if parsed['diseaseDetected']:
+            parsed['healthScore'] = max(0, 100 - int(parsed['confidence']))
+        else:
+            parsed['healthScore'] = min(100, int(parsed['confidence']))
+        
+        # Add full AI text as aiAssist if not already present
+        if 'aiAssist' not in parsed:
+            parsed['aiAssist'] = ai_text
+        
+        logger.info(f"✓ Parsed AI analysis: {parsed['plantName']}, disease={parsed['diseaseDetected']}")
+        return parsed
+        
+    except Exception as e:
+        logger.error(f"Failed to parse AI analysis: {e}")
+        return None
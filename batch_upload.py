@@ -0,0 +1,72 @@
+"""Expand a /predict/batch upload into individual images.
+
+Clients send several image files, one or more zip archives of images, or a
+mix of both. Archives are opened in memory, and only image entries are kept
+(no directories and no macOS resource forks). The item count and the total
+uncompressed size are capped before anything is decompressed, so a zip bomb
+is rejected from its directory alone.
+"""
+import io
+import os
+import zipfile
+from typing import Iterable, List, Tuple
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff', '.heic', '.heif')
+
+
+def is_zip(data: bytes) -> bool:
+    return data[:4] == b'PK\x03\x04'
+
+
+def _zip_images(name: str, archive: zipfile.ZipFile) -> List[Tuple[str, zipfile.ZipInfo]]:
+    entries = []
+    for info in archive.infolist():
+        base = os.path.basename(info.filename)
+        if info.is_dir() or base.startswith('.') or info.filename.startswith('__MACOSX/'):
+            continue
+        if base.lower().endswith(IMAGE_EXTENSIONS):
+            entries.append((f"{name}/{info.filename}", info))
+    return entries
+
+
+def expand_uploads(uploads: Iterable[Tuple[str, bytes]], max_items: int = 64,
+                   max_bytes: int = 200 * 1024 * 1024) -> List[Tuple[str, bytes]]:
+    """``(filename, bytes)`` for every image in ``uploads``, in upload order.
+
+    Raises ValueError if the batch has no images, more than ``max_items``,
+    or more than ``max_bytes`` of (uncompressed) image data.
+    """
+    items = []
+    total = 0
+
+    def check(size: int):
+        nonlocal total
+        total += size
+        if len(items) >= max_items:
+            raise ValueError(f"Batch exceeds {max_items} images")
+        if total > max_bytes:
+            raise ValueError(f"Batch exceeds {max_bytes // (1024 * 1024)} MB of image data")
+
+    for name, data in uploads:
+        if not is_zip(data):
+            check(len(data))
+            items.append((name, data))
+            continue
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(data))
+            entries = _zip_images(name, archive)
+            # Declared sizes are checked for the whole archive before inflating anything
+            start = len(items)
+            for entry_name, info in entries:
+                check(info.file_size)
+                items.append((entry_name, None))
+            for i, (entry_name, info) in enumerate(entries, start):
+                with archive.open(info) as f:
+                    # Never read past the declared size, in case the header lies
+                    items[i] = (entry_name, f.read(info.file_size))
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Invalid zip archive '{name}': {e}")
+
+    if not items:
+        raise ValueError("No images in upload")
+    return items
@@ -0,0 +1,168 @@
+"""Dynamic micro-batching for model inference.
+
+Concurrent /predict requests each submit a preprocessed ``(1, H, W, 3)`` tensor.
+A single worker task gathers them and runs one batched forward pass as soon as
+either ``max_batch_size`` tensors are queued or the oldest one has waited
+``max_wait_ms``. Every caller then receives its own row of each model output.
+Up to ``max_concurrent_batches`` forward passes run at once (size it to the
+inference pool); while all are busy, new requests keep queueing and form the
+next, larger batch.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from concurrent.futures import Executor
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects single-image inference requests into batches."""
+
+    def __init__(self, infer_fn: Callable[[np.ndarray], Sequence[np.ndarray]],
+                 max_batch_size: int = 8, max_wait_ms: float = 5.0,
+                 executor: Optional[Executor] = None, wait_window: int = 1000,
+                 max_concurrent_batches: int = 1):
+        self.infer_fn = infer_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.executor = executor
+        self.max_concurrent_batches = max(1, int(max_concurrent_batches))
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batches_in_flight: set = set()
+
+        # Metrics
+        self.batch_size_counts = Counter()
+        self.items_processed = 0
+        self.batches_processed = 0
+        self._queue_waits_ms = deque(maxlen=wait_window)
+
+    def _ensure_started(self):
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, tensor: np.ndarray) -> tuple:
+        """Queue one preprocessed tensor and wait for its slice of the outputs.
+
+        Each returned array keeps a leading batch dimension of 1, so results
+        can be indexed exactly like a batch-of-1 ``predict`` call.
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((tensor, future, time.perf_counter()))
+        return await future
+
+    async def stop(self):
+        """Cancel the worker and running batches; pending callers receive a CancelledError."""
+        tasks = [self._worker] if self._worker is not None else []
+        tasks += list(self._batches_in_flight)
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            future.cancel()
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            # Only collect once a slot is free, so a busy model gets bigger batches
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            # Drop callers that disconnected while queued
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                self._slots.release()
+                continue
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._batches_in_flight.add(task)
+            task.add_done_callback(self._batches_in_flight.discard)
+
+    async def _dispatch(self, batch: list):
+        """Run one batch in the executor and resolve its callers' futures."""
+        try:
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self._queue_waits_ms.append((started - enqueued) * 1000)
+            self.batch_size_counts[len(batch)] += 1
+            self.batches_processed += 1
+            self.items_processed += len(batch)
+
+            try:
+                inputs = np.concatenate([tensor for tensor, _, _ in batch], axis=0)
+                outputs = await asyncio.get_running_loop().run_in_executor(self.executor, self.infer_fn, inputs)
+            except Exception as e:
+                logger.error(f"Batched inference failed ({len(batch)} items): {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+
+            for i, (_, future, _) in enumerate(batch):
+                if not future.done():
+                    future.set_result(tuple(output[i:i + 1] for output in outputs))
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Batch-size distribution and queue-wait summary."""
+        waits = sorted(self._queue_waits_ms)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3)
+
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'max_concurrent_batches': self.max_concurrent_batches,
+            'batches_in_flight': len(self._batches_in_flight),
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'batches': self.batches_processed,
+            'items': self.items_processed,
+            'avg_batch_size': round(self.items_processed / self.batches_processed, 2) if self.batches_processed else 0.0,
+            'batch_size_distribution': {str(size): count for size, count in sorted(self.batch_size_counts.items())},
+            'queue_wait_ms': {
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': round(waits[-1], 3) if waits else 0.0,
+            },
+        }
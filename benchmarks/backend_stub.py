@@ -0,0 +1,172 @@
+"""Local stand-in for both of the server's backends: Gemini and Supabase REST.
+
+Extends ``GeminiStub`` (generateContent / streamGenerateContent, with
+``usageMetadata``) with the PostgREST calls made by ``SupabaseRepository``.
+Those are inserts (``POST /rest/v1/<table>``, honouring
+``Prefer: return=representation``) and history selects (``GET`` with
+``select``, ``<column>=eq.<value>``, ``order``, ``limit`` and the keyset
+``or`` filter). Rows live in memory, capped per table.
+
+Gemini and database latency are configured separately. The error and
+timeout rates apply to both. Run it standalone and point the server at it:
+
+    python benchmarks/backend_stub.py --port 8787 --gemini-latency-ms 800 --db-latency-ms 20 \\
+        --error-rate 0.02 --timeout-rate 0.01
+    # then start the server with the printed LLM_URL / SUPABASE_URL settings
+
+``benchmarks/load_test.py`` starts one automatically.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gemini_stub import GeminiStub  # noqa: E402
+
+# A takeover reply in the format call_gemini_complete_analysis asks for
+TAKEOVER_TEXT = """PLANT: Tomato
+DISEASE: Yes - Early Blight
+CONFIDENCE: 82
+SEVERITY: Medium
+SYMPTOMS: Concentric brown rings on lower leaves | Yellow halos around lesions
+RECOMMENDATIONS: Remove infected leaves | Apply copper fungicide | Water at the base | Rotate crops
+ANALYSIS: Target-shaped lesions on older leaves point to Alternaria. Spread is moderate."""
+
+_KEYSET = re.compile(r'created_at\.lt\."([^"]*)".*id\.lt\."([^"]*)"')
+
+
+class BackendStub(GeminiStub):
+    """GeminiStub that also answers Supabase ``/rest/v1`` requests."""
+
+    def __init__(self, db_latency_ms: float = 0.0, max_rows: int = 100000, **kwargs):
+        kwargs.setdefault('text', TAKEOVER_TEXT)
+        super().__init__(**kwargs)
+        self.db_latency = db_latency_ms / 1000
+        self.tables = defaultdict(lambda: deque(maxlen=max_rows))
+        self.db_requests = 0
+        self.gemini_requests = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def delay(self, path: str) -> float:
+        if path.startswith('/rest/v1/'):
+            return self.db_latency + self.random.uniform(0, self.jitter)
+        return super().delay(path)
+
+    async def respond_error(self, writer: asyncio.StreamWriter, path: str):
+        if not path.startswith('/rest/v1/'):
+            await super().respond_error(writer, path)
+            return
+        await self.write_json(writer, {'code': '57014', 'message': 'canceling statement due to statement timeout'},
+                              '503 Service Unavailable')
+
+    async def respond(self, writer: asyncio.StreamWriter, request: tuple):
+        method, path, headers, body = request
+        if not path.startswith('/rest/v1/'):
+            self.gemini_requests += 1
+            await super().respond(writer, request)
+            return
+        self.db_requests += 1
+        url = urlsplit(path)
+        table = url.path[len('/rest/v1/'):]
+        if method == 'POST':
+            await self.insert(writer, table, json.loads(body or b'[]'), headers.get('prefer', ''))
+        elif method == 'GET':
+            await self.write_json(writer, self.select(table, dict(parse_qsl(url.query))))
+        else:
+            await self.write_json(writer, {'message': f'{method} not supported by the stub'}, '405 Method Not Allowed')
+
+    async def insert(self, writer: asyncio.StreamWriter, table: str, records, prefer: str):
+        rows = []
+        for record in records if isinstance(records, list) else [records]:
+            row = {'id': str(uuid.uuid4()), 'created_at': datetime.now(timezone.utc).isoformat(), **record}
+            self.tables[table].append(row)
+            rows.append(row)
+        if 'return=representation' in prefer:
+            await self.write_json(writer, rows, '201 Created')
+        else:
+            writer.write(b'HTTP/1.1 201 Created\r\nConnection: keep-alive\r\nContent-Length: 0\r\n\r\n')
+            await writer.drain()
+
+    def select(self, table: str, params: dict) -> list:
+        rows = list(self.tables[table])
+        for column, condition in params.items():
+            if column not in ('select', 'order', 'limit', 'or') and condition.startswith('eq.'):
+                rows = [row for row in rows if str(row.get(column)) == condition[3:]]
+        keyset = _KEYSET.search(params.get('or', ''))
+        if keyset:
+            created_at, row_id = keyset.groups()
+            rows = [row for row in rows if (row['created_at'], row['id']) < (created_at, row_id)]
+        rows.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+        if 'limit' in params:
+            rows = rows[:int(params['limit'])]
+        select = params.get('select', '*')
+        if select != '*':
+            columns = select.split(',')
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        return rows
+
+    def stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'db_requests': self.db_requests,
+            'gemini_requests': self.gemini_requests,
+            'errors_injected': self.errors_injected,
+            'timeouts_injected': self.timeouts_injected,
+            'connections': self.connections,
+            'rows': {table: len(rows) for table, rows in self.tables.items()},
+        }
+
+
+async def serve(args):
+    stub = BackendStub(
+        host=args.host, port=args.port, latency_ms=args.gemini_latency_ms, db_latency_ms=args.db_latency_ms,
+        jitter_ms=args.jitter_ms, error_rate=args.error_rate, timeout_rate=args.timeout_rate,
+        hang_ms=args.hang_ms, seed=args.seed
+    )
+    gemini_url = await stub.start()
+    print("🧪 Backend stub running. Start the server with:")
+    print(f"   LLM_URL={gemini_url}")
+    print("   LLM_API_KEY=stub")
+    print(f"   SUPABASE_URL={stub.base_url}")
+    print("   SUPABASE_SERVICE_KEY=stub")
+    print("   DB_BACKEND=supabase")
+    try:
+        while True:
+            await asyncio.sleep(args.report_every)
+            print(f"   {stub.stats()}")
+    finally:
+        await stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--gemini-latency-ms', type=float, default=800.0)
+    parser.add_argument('--db-latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra uniform random latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests that hang, then drop')
+    parser.add_argument('--hang-ms', type=float, default=25000.0, help='How long a "timeout" request hangs')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--report-every', type=float, default=30.0, help='Seconds between stats lines')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: time-to-first-byte of buffered vs. streamed Gemini chat replies.
+
+Runs against a local GeminiStub that "generates" the reply in ``--chunks``
+pieces, one every ``--chunk-delay-ms``. The buffered call (what /chat does)
+cannot return anything until the whole completion is done; the streamed call
+(what /chat/stream relays as SSE) gets its first text after one chunk.
+
+With ``--server`` the same comparison is made end to end against a running
+server's /chat and /chat/stream endpoints instead of the client directly.
+
+Usage:
+    python benchmarks/bench_chat_stream.py --chunks 20 --chunk-delay-ms 50
+    python benchmarks/bench_chat_stream.py --server http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient  # noqa: E402
+from gemini_stub import GeminiStub  # noqa: E402
+
+PROMPT = 'How do I treat early blight on tomato?'
+
+
+async def buffered_via_client(client: GeminiClient) -> tuple:
+    start = time.perf_counter()
+    resp = await client.generate({'contents': [{'parts': [{'text': PROMPT}]}]})
+    resp.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def streamed_via_client(client: GeminiClient) -> tuple:
+    start = time.perf_counter()
+    first = None
+    async for _ in client.stream_text({'contents': [{'parts': [{'text': PROMPT}]}]}):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def buffered_via_server(http: httpx.AsyncClient, server: str) -> tuple:
+    start = time.perf_counter()
+    resp = await http.post(f"{server}/chat", json={'prompt': PROMPT})
+    resp.raise_for_status()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def streamed_via_server(http: httpx.AsyncClient, server: str) -> tuple:
+    start = time.perf_counter()
+    first = None
+    async with http.stream('POST', f"{server}/chat/stream", json={'prompt': PROMPT}) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if first is None and line.startswith('data:'):
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+def report(label: str, results: list):
+    ttfb = sorted(r[0] * 1000 for r in results)
+    total = sorted(r[1] * 1000 for r in results)
+    print(f"{label:<10} TTFB p50 {ttfb[len(ttfb) // 2]:8.1f} ms   total p50 {total[len(total) // 2]:8.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--chunks', type=int, default=20)
+    parser.add_argument('--chunk-delay-ms', type=float, default=50.0)
+    parser.add_argument('--server', help='Base URL of a running server (its LLM_URL should point at a stub)')
+    args = parser.parse_args()
+
+    if args.server:
+        async with httpx.AsyncClient(timeout=60.0) as http:
+            report('buffered', [await buffered_via_server(http, args.server) for _ in range(args.runs)])
+            report('streamed', [await streamed_via_server(http, args.server) for _ in range(args.runs)])
+        return
+
+    stub = GeminiStub(text='Remove infected leaves. ' * 40, chunks=args.chunks, chunk_delay_ms=args.chunk_delay_ms)
+    url = await stub.start()
+    client = GeminiClient(url, 'stub', {'tokens_input': 0, 'tokens_output': 0, 'tokens_used': 0}, http2=False)
+    report('buffered', [await buffered_via_client(client) for _ in range(args.runs)])
+    report('streamed', [await streamed_via_client(client) for _ in range(args.runs)])
+    await client.aclose()
+    await stub.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,46 @@
+"""Benchmark: per-call latency of each inference mode at batch sizes 1, 8 and 32.
+
+Compares Keras ``Model.predict`` against the traced fixed-signature function
+(optionally XLA-compiled) used by ``KerasEngine``. Uses the notebook model
+layout with random weights, so no model file is required.
+
+Usage:
+    python benchmarks/bench_compiled.py --iterations 20 --modes predict function xla
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference_engine import INPUT_SHAPE  # noqa: E402
+from keras_engine import INFERENCE_MODES, KerasEngine, build_multi_head_model  # noqa: E402
+from bench_multihead import build_notebook_models, time_it  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--modes', nargs='+', default=list(INFERENCE_MODES), choices=INFERENCE_MODES)
+    args = parser.parse_args()
+
+    species_model, disease_model = build_notebook_models(80, 28)
+    model = build_multi_head_model(disease_model, species_model)
+    engines = {mode: KerasEngine.from_model(model, dual_head=True, mode=mode, max_batch_size=max(args.batch_sizes))
+               for mode in args.modes}
+
+    print(f"{'batch':>6} " + ' '.join(f"{mode + ' ms':>14}" for mode in args.modes))
+    for batch_size in args.batch_sizes:
+        batch = np.random.uniform(0, 255, size=(batch_size,) + INPUT_SHAPE).astype(np.float32)
+        row = []
+        for mode in args.modes:
+            engine = engines[mode]
+            row.append(time_it(lambda: engine.infer_batch(batch), args.iterations))
+        print(f"{batch_size:>6} " + ' '.join(f"{ms:>14.2f}" for ms in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark: full-resolution decode vs. draft-mode decode in ``preprocess_image``.
+
+For each path the corpus is decoded in a fresh process so peak memory
+(resident high-water mark above the post-load baseline) is not polluted by
+the other run.
+Parity of the fast path against the original output is reported as mean /
+max absolute pixel difference and PSNR over the whole corpus.
+
+Without ``--images`` a synthetic corpus of 12 MP "phone photos" (4032x3024
+JPEGs, smooth content plus sensor-like noise) is generated in a temp dir.
+
+Usage:
+    python benchmarks/bench_decode.py --images ~/Pictures/leaves
+    python benchmarks/bench_decode.py --synthetic 20
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocessing import list_images, preprocess_image  # noqa: E402
+
+
+def synthetic_corpus(folder: str, count: int, size=(4032, 3024)) -> list:
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(count):
+        coarse = rng.uniform(0, 255, (size[1] // 64, size[0] // 64, 3)).astype(np.uint8)
+        smooth = np.asarray(Image.fromarray(coarse).resize(size, Image.BICUBIC), dtype=np.int16)
+        noisy = np.clip(smooth + rng.integers(-12, 12, smooth.shape, dtype=np.int16), 0, 255)
+        path = os.path.join(folder, f"phone_{i:03d}.jpg")
+        Image.fromarray(noisy.astype(np.uint8)).save(path, 'JPEG', quality=92)
+        paths.append(path)
+    return paths
+
+
+def reset_peak_rss():
+    """Reset the kernel's peak-RSS counter (Linux); a no-op elsewhere."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss survives exec on Linux, so a spawned child would inherit the
+    # parent's peak; VmHWM belongs to this process image only
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def run_path(paths: list, fast: bool, queue):
+    blobs = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            blobs.append(f.read())
+    # The counter is a high-water mark, so take the baseline before any decode
+    reset_peak_rss()
+    baseline = peak_rss_mb()
+    times = []
+    for blob in blobs:
+        start = time.perf_counter()
+        preprocess_image(blob, fast)
+        times.append((time.perf_counter() - start) * 1000)
+    queue.put((times, peak_rss_mb() - baseline))
+
+
+def measure(paths: list, fast: bool) -> tuple:
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    proc = ctx.Process(target=run_path, args=(paths, fast, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def parity(paths: list) -> dict:
+    abs_sum, sq_sum, max_diff, n = 0.0, 0.0, 0.0, 0
+    for path in paths:
+        with open(path, 'rb') as f:
+            blob = f.read()
+        diff = preprocess_image(blob, fast=True) - preprocess_image(blob, fast=False)
+        abs_sum += np.abs(diff).sum()
+        sq_sum += np.square(diff).sum()
+        max_diff = max(max_diff, float(np.abs(diff).max()))
+        n += diff.size
+    mse = sq_sum / n
+    return {
+        'mae': abs_sum / n,
+        'max': max_diff,
+        'psnr': 10 * np.log10(255 ** 2 / mse) if mse else float('inf'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', help='Folder of sample photos (searched recursively)')
+    parser.add_argument('--synthetic', type=int, default=10, help='Synthetic photos to generate without --images')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.images:
+            paths = list_images(args.images)
+        else:
+            print(f"Generating {args.synthetic} synthetic 12 MP JPEGs...")
+            paths = synthetic_corpus(tmp, args.synthetic)
+        if not paths:
+            sys.exit('No images found')
+
+        with Image.open(paths[0]) as first:
+            print(f"{len(paths)} images, first is {first.format} {first.size[0]}x{first.size[1]}\n")
+
+        results = {}
+        for label, fast in (('full decode', False), ('draft decode', True)):
+            times, peak = measure(paths, fast)
+            results[label] = float(np.mean(times))
+            print(f"{label:<13} mean {np.mean(times):7.1f} ms   p95 {np.percentile(times, 95):7.1f} ms"
+                  f"   peak +{peak:6.1f} MB")
+
+        print(f"\nSpeedup       {results['full decode'] / results['draft decode']:.2f}x")
+        p = parity(paths)
+        print(f"Parity        mae {p['mae']:.3f}   max {p['max']:.0f}   psnr {p['psnr']:.1f} dB  (0-255 scale)")
+
+
+if __name__ == '__main__':
+    main()
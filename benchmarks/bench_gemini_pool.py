@@ -0,0 +1,92 @@
+"""Benchmark: per-request httpx.AsyncClient vs. the shared pooled GeminiClient.
+
+By default runs against a local GeminiStub, which shows the TCP connect cost
+and connection reuse. Pass ``--url`` (with ``LLM_API_KEY`` set) to measure
+against a real TLS endpoint, where each avoided handshake saves far more.
+
+Usage:
+    python benchmarks/bench_gemini_pool.py --requests 200 --concurrency 10 --latency-ms 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_client import GeminiClient  # noqa: E402
+from gemini_stub import GeminiStub  # noqa: E402
+
+PAYLOAD = {'contents': [{'parts': [{'text': 'ping'}]}]}
+
+
+async def per_request_client(url: str, key: str):
+    """What the server did before: a fresh client (and connection) per call."""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        resp = await client.post(f"{url}?key={key}", json=PAYLOAD, headers={'Content-Type': 'application/json'})
+        resp.raise_for_status()
+
+
+async def run(label: str, call, requests: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(f"{label:<22} mean {sum(latencies) / len(latencies):7.2f} ms   "
+          f"p50 {latencies[len(latencies) // 2]:7.2f} ms   "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:7.2f} ms   "
+          f"{requests / elapsed:8.1f} req/s")
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Stub server think time')
+    parser.add_argument('--url', help='Real generateContent URL instead of the local stub')
+    args = parser.parse_args()
+
+    stub = None
+    url, key = args.url, os.getenv('LLM_API_KEY', 'stub')
+    if not url:
+        stub = GeminiStub(latency_ms=args.latency_ms)
+        url = await stub.start()
+
+    usage = {'tokens_input': 0, 'tokens_output': 0, 'tokens_used': 0}
+    pooled = GeminiClient(url, key, usage, max_connections=args.concurrency, max_keepalive=args.concurrency)
+    pooled.start()
+
+    async def shared_client():
+        resp = await pooled.generate(PAYLOAD)
+        resp.raise_for_status()
+
+    before = stub.connections if stub else 0
+    await run('per-request client', lambda: per_request_client(url, key), args.requests, args.concurrency)
+    if stub:
+        print(f"{'':<22} {stub.connections - before} TCP connections")
+        before = stub.connections
+
+    await run('shared pooled client', shared_client, args.requests, args.concurrency)
+    if stub:
+        print(f"{'':<22} {stub.connections - before} TCP connections")
+
+    await pooled.aclose()
+    if stub:
+        await stub.stop()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
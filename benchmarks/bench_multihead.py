@@ -0,0 +1,78 @@
+"""Benchmark: two identical forward passes vs. one multi-head forward pass.
+
+Rebuilds the species -> disease transfer setup from disease_detect.ipynb with
+random weights (no download needed), then times the old /predict pattern
+(``MODEL.predict`` twice) against ``KerasEngine.infer_batch``.
+
+Usage:
+    python benchmarks/bench_multihead.py --iterations 50
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keras_engine import KerasEngine, build_multi_head_model  # noqa: E402
+
+IMG_SIZE = (224, 224)
+
+
+def build_notebook_models(num_species: int, num_diseases: int):
+    """Species classifier + disease detector, wired exactly like the notebooks."""
+    base = tf.keras.applications.EfficientNetB0(weights=None, include_top=False,
+                                                input_shape=(IMG_SIZE[0], IMG_SIZE[1], 3))
+    inputs = tf.keras.Input(shape=(IMG_SIZE[0], IMG_SIZE[1], 3))
+    x = base(inputs, training=False)
+    x = tf.keras.layers.GlobalAveragePooling2D()(x)
+    x = tf.keras.layers.Dropout(0.3)(x)
+    outputs = tf.keras.layers.Dense(num_species, activation='softmax')(x)
+    species_model = tf.keras.Model(inputs, outputs)
+
+    x = species_model.layers[-3].output
+    disease_output = tf.keras.layers.Dense(num_diseases, activation='softmax')(x)
+    disease_model = tf.keras.Model(inputs=species_model.input, outputs=disease_output)
+    return species_model, disease_model
+
+
+def time_it(fn, iterations: int) -> float:
+    """Mean wall time of ``fn()`` in milliseconds after one warmup call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--species', type=int, default=80)
+    parser.add_argument('--diseases', type=int, default=28)
+    args = parser.parse_args()
+
+    species_model, disease_model = build_notebook_models(args.species, args.diseases)
+    engine = KerasEngine.from_model(build_multi_head_model(disease_model, species_model), dual_head=True, mode='predict')
+    image = np.random.uniform(0, 255, size=(1, IMG_SIZE[0], IMG_SIZE[1], 3)).astype(np.float32)
+
+    def two_passes():
+        species_model.predict(image, verbose=0)
+        disease_model.predict(image, verbose=0)
+
+    def one_pass():
+        engine.infer_batch(image)
+
+    two_ms = time_it(two_passes, args.iterations)
+    one_ms = time_it(one_pass, args.iterations)
+
+    print(f"Two forward passes : {two_ms:8.2f} ms/scan")
+    print(f"Multi-head pass    : {one_ms:8.2f} ms/scan")
+    print(f"Speedup            : {two_ms / one_ms:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
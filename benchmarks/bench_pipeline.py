@@ -0,0 +1,238 @@
+"""Microbenchmarks for each stage of the /predict pipeline, with a regression gate.
+
+Stages, each timed on its own:
+
+* ``decode/<image>/<fast|full>`` - ``preprocess_image`` on seeded synthetic
+  JPEGs at several resolutions, plus the bundled sample photo
+* ``model/batch=<n>``            - ``infer_batch`` at several batch sizes
+  (``--backend``/``--model``, or the notebook architecture with random
+  weights when only TensorFlow is available; skipped otherwise)
+* ``analysis/*``                 - ``create_dual_model_analysis`` and
+  ``parse_ai_analysis`` on a fixed Gemini reply
+* ``json/*``                     - serializing a single analysis and a full
+  history page
+
+Every stage is auto-ranged to at least ``--min-time`` seconds per sample.
+The median of ``--repeat`` samples is reported. ``--save-baseline`` writes
+the results to a JSON file. ``--compare`` checks against that file and exits
+with status 1 when any stage is more than ``--tolerance`` slower than its
+baseline. Baselines are only comparable on the same machine.
+
+Usage:
+    python benchmarks/bench_pipeline.py --save-baseline
+    python benchmarks/bench_pipeline.py --compare --tolerance 0.15
+    python benchmarks/bench_pipeline.py --filter decode --compare
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Optional
+
+import numpy as np
+from PIL import Image
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analysis import create_dual_model_analysis, parse_ai_analysis  # noqa: E402
+from inference_engine import INFERENCE_BACKENDS, INPUT_SHAPE, create_engine  # noqa: E402
+from preprocessing import preprocess_image  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'pipeline_baseline.json')
+SAMPLE_IMAGE = os.path.join(ROOT, 'src', 'assets', 'hero-plants.jpg')
+IMAGE_SIZES = {'vga': (640, 480), 'fhd': (1920, 1080), 'phone': (4032, 3024)}
+
+GEMINI_REPLY = """PLANT: Tomato (Solanum lycopersicum)
+DISEASE: Yes - Early Blight
+CONFIDENCE: 87
+SEVERITY: Medium
+SYMPTOMS: Concentric brown rings on lower leaves | Yellowing around lesions | Leaf drop on older growth
+RECOMMENDATIONS: Remove infected leaves | Apply a copper-based fungicide | Water at the base, not the foliage | Rotate crops next season
+ANALYSIS: The lower leaves show target-like lesions typical of Alternaria solani. Spread is moderate and the upper canopy is still clean."""
+
+
+def synthetic_jpeg(width: int, height: int, seed: int = 0) -> bytes:
+    """Deterministic photo-like JPEG: smooth gradients plus mild noise."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(x / width * 6.0),
+        140 + 90 * np.cos(y / height * 4.0),
+        90 + 60 * np.sin((x + y) / (width + height) * 9.0),
+    ], axis=-1)
+    pixels = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, format='JPEG', quality=90)
+    return out.getvalue()
+
+
+def measure(fn: Callable, repeat: int, min_time: float) -> dict:
+    """Median / min per-call time (ms) of ``fn`` over ``repeat`` auto-ranged samples."""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 4),
+        'min_ms': round(min(samples) * 1000, 4),
+        'loops': loops,
+    }
+
+
+def load_engine(args) -> Optional[object]:
+    """The engine for the model stage, or None (with a note) if unavailable."""
+    if args.model:
+        engine = create_engine(args.backend, args.model, num_threads=args.threads,
+                               max_batch_size=max(args.batch_sizes))
+        engine.load()
+        return engine
+    try:
+        from bench_multihead import build_notebook_models
+        from keras_engine import KerasEngine, build_multi_head_model
+    except ImportError:
+        print("ℹ️ model stage skipped (no --model and TensorFlow is not installed)")
+        return None
+    species_model, disease_model = build_notebook_models(80, 28)
+    return KerasEngine.from_model(build_multi_head_model(disease_model, species_model), dual_head=True,
+                                  max_batch_size=max(args.batch_sizes))
+
+
+def build_stages(args) -> dict:
+    """Stage name -> zero-argument callable."""
+    stages = {}
+
+    images = {name: synthetic_jpeg(w, h, seed=i) for i, (name, (w, h)) in enumerate(IMAGE_SIZES.items())}
+    if os.path.exists(SAMPLE_IMAGE):
+        with open(SAMPLE_IMAGE, 'rb') as f:
+            images['sample'] = f.read()
+    for name, data in images.items():
+        stages[f'decode/{name}/fast'] = lambda data=data: preprocess_image(data, True)
+        stages[f'decode/{name}/full'] = lambda data=data: preprocess_image(data, False)
+
+    if not args.filter or any('model'.startswith(f) or f.startswith('model') for f in args.filter):
+        engine = load_engine(args)
+        if engine is not None:
+            rng = np.random.default_rng(0)
+            for batch_size in args.batch_sizes:
+                batch = rng.uniform(0, 255, size=(batch_size,) + INPUT_SHAPE).astype(np.float32)
+                engine.warmup(batch_size)
+                stages[f'model/batch={batch_size}'] = lambda batch=batch: engine.infer_batch(batch)
+
+    analysis = create_dual_model_analysis('Tomato', 91.3, 'Tomato Early blight', 78.4)
+    stages['analysis/create_dual_model_analysis'] = \
+        lambda: create_dual_model_analysis('Tomato', 91.3, 'Tomato Early blight', 78.4)
+    stages['analysis/parse_ai_analysis'] = lambda: parse_ai_analysis(GEMINI_REPLY)
+
+    ai_analysis = parse_ai_analysis(GEMINI_REPLY)
+    history = {
+        'success': True,
+        'data': [{'id': f'{i:08d}', 'created_at': '2026-01-01T00:00:00+00:00', 'analysis_data': ai_analysis}
+                 for i in range(100)],
+        'count': 100,
+        'next_cursor': None,
+    }
+    stages['json/analysis'] = lambda: json.dumps(analysis)
+    stages['json/history_page_100'] = lambda: json.dumps(history, default=str)
+    return stages
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Print a comparison table; return the names of regressed stages."""
+    regressions = []
+    print(f"\n{'stage':<42} {'baseline ms':>12} {'now ms':>10} {'change':>8}")
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            print(f"{name:<42} {'-':>12} {result['median_ms']:>10.4f} {'new':>8}")
+            continue
+        change = result['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  ❌'
+        print(f"{name:<42} {base['median_ms']:>12.4f} {result['median_ms']:>10.4f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', nargs='*', default=[], help='Only run stages starting with these prefixes')
+    parser.add_argument('--repeat', type=int, default=7, help='Samples per stage (median is reported)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='Minimum seconds per sample')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--backend', choices=INFERENCE_BACKENDS, default='keras')
+    parser.add_argument('--model', help='Model file for the model stage (default: random-weight notebook model)')
+    parser.add_argument('--threads', type=int, default=None, help='TFLite/ONNX Runtime threads')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Write the results as the new baseline')
+    parser.add_argument('--compare', action='store_true', help='Fail if a stage regressed past --tolerance')
+    parser.add_argument('--tolerance', type=float, default=float(os.getenv('BENCH_TOLERANCE', '0.15')),
+                        help='Allowed slowdown as a fraction of the baseline median (0.15 = 15%%)')
+    args = parser.parse_args()
+
+    stages = build_stages(args)
+    if args.filter:
+        stages = {name: fn for name, fn in stages.items() if any(name.startswith(f) for f in args.filter)}
+
+    results = {}
+    print(f"{'stage':<42} {'median ms':>10} {'min ms':>10} {'loops':>7}")
+    for name, fn in stages.items():
+        results[name] = measure(fn, args.repeat, args.min_time)
+        r = results[name]
+        print(f"{name:<42} {r['median_ms']:>10.4f} {r['min_ms']:>10.4f} {r['loops']:>7}")
+
+    status = 0
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            sys.exit(f"❌ No baseline at {args.baseline} (run with --save-baseline first)")
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('machine') != platform.machine() or baseline.get('python') != platform.python_version():
+            print(f"⚠ Baseline was recorded on {baseline.get('machine')} / Python {baseline.get('python')}")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} stage(s) regressed by more than {args.tolerance:.0%}: "
+                  + ', '.join(regressions))
+            status = 1
+        else:
+            print(f"\n✅ No stage regressed by more than {args.tolerance:.0%}")
+
+    if args.save_baseline:
+        baseline = {'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        # Merge, so a filtered run only updates the stages it measured
+        baseline.update({
+            'machine': platform.machine(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pillow': Image.__version__,
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        baseline['results'].update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"💾 Baseline written to {args.baseline}")
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""Minimal local stand-in for the Gemini generateContent endpoint.
+
+Speaks just enough HTTP/1.1 (with keep-alive) to answer POSTs to
+``.../models/<model>:generateContent`` with the real response shape,
+including ``usageMetadata``. It counts accepted TCP connections so
+benchmarks can show whether a client reuses them.
+
+``:streamGenerateContent?alt=sse`` is answered with the text split into
+``chunks`` SSE events, one every ``chunk_delay_ms``; the final event carries
+``usageMetadata``. A buffered request waits for the whole "generation"
+(``chunks * chunk_delay_ms``) before answering, like the real API.
+
+Faults can be injected: ``error_rate`` of requests get a 503 in the Gemini
+error shape, and ``timeout_rate`` hang for ``hang_ms`` and then drop the
+connection without replying. ``jitter_ms`` adds uniform random latency.
+
+    stub = GeminiStub(latency_ms=50)
+    url = await stub.start()      # http://127.0.0.1:<port>/v1beta/models/stub:generateContent
+    ...
+    await stub.stop()
+"""
+import asyncio
+import json
+import random
+from typing import Optional
+
+
+def generate_content_response(text: str, prompt_tokens: int = 250) -> dict:
+    """A generateContent response body carrying ``text``."""
+    completion_tokens = max(1, len(text) // 4)
+    return {
+        'candidates': [{
+            'content': {'parts': [{'text': text}], 'role': 'model'},
+            'finishReason': 'STOP',
+            'index': 0
+        }],
+        'usageMetadata': {
+            'promptTokenCount': prompt_tokens,
+            'candidatesTokenCount': completion_tokens,
+            'totalTokenCount': prompt_tokens + completion_tokens
+        }
+    }
+
+
+class GeminiStub:
+    """Asyncio HTTP server returning canned Gemini responses after a fixed delay."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0.0,
+                 text: str = 'PLANT: Tomato\nDISEASE: No - Healthy\nCONFIDENCE: 90',
+                 chunks: int = 1, chunk_delay_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, timeout_rate: float = 0.0, hang_ms: float = 25000.0,
+                 seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.text = text
+        self.chunks = max(1, chunks)
+        self.chunk_delay = chunk_delay_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang_ms / 1000
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.errors_injected = 0
+        self.timeouts_injected = 0
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"http://{self.host}:{self.port}/v1beta/models/stub:generateContent"
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, value = line.decode('latin-1').split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get('content-length', 0)))
+        return method, path, headers, body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                self.requests += 1
+                _, path, headers, _ = request
+                await asyncio.sleep(self.delay(path))
+                roll = self.random.random()
+                if roll < self.timeout_rate:
+                    self.timeouts_injected += 1
+                    await asyncio.sleep(self.hang)
+                    break
+                if roll < self.timeout_rate + self.error_rate:
+                    self.errors_injected += 1
+                    await self.respond_error(writer, path)
+                else:
+                    await self.respond(writer, request)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            # CancelledError: a hanging "timeout" request when the stub shuts down
+            pass
+        finally:
+            writer.close()
+
+    def delay(self, path: str) -> float:
+        """Seconds to wait before answering a request for ``path``."""
+        return self.latency + self.random.uniform(0, self.jitter)
+
+    async def write_json(self, writer: asyncio.StreamWriter, data, status: str = '200 OK'):
+        body = json.dumps(data).encode('utf-8')
+        writer.write(
+            f'HTTP/1.1 {status}\r\n'.encode('latin-1')
+            + b'Content-Type: application/json\r\n'
+            b'Connection: keep-alive\r\n'
+            + f'Content-Length: {len(body)}\r\n\r\n'.encode('latin-1')
+            + body
+        )
+        await writer.drain()
+
+    async def respond_error(self, writer: asyncio.StreamWriter, path: str):
+        await self.write_json(writer, {
+            'error': {'code': 503, 'message': 'The model is overloaded. Please try again later.',
+                      'status': 'UNAVAILABLE'}
+        }, '503 Service Unavailable')
+
+    def text_chunks(self) -> list:
+        size = -(-len(self.text) // self.chunks)
+        return [self.text[i:i + size] for i in range(0, len(self.text), size)] or ['']
+
+    async def respond(self, writer: asyncio.StreamWriter, request: tuple):
+        _, path, _, _ = request
+        if ':streamGenerateContent' in path:
+            await self.respond_stream(writer)
+            return
+        await asyncio.sleep(self.chunk_delay * self.chunks)
+        await self.write_json(writer, generate_content_response(self.text))
+
+    async def respond_stream(self, writer: asyncio.StreamWriter):
+        writer.write(
+            b'HTTP/1.1 200 OK\r\n'
+            b'Content-Type: text/event-stream\r\n'
+            b'Connection: keep-alive\r\n'
+            b'Transfer-Encoding: chunked\r\n\r\n'
+        )
+        pieces = self.text_chunks()
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(self.chunk_delay)
+            chunk = generate_content_response(piece)
+            if i < len(pieces) - 1:
+                del chunk['usageMetadata']
+            else:
+                chunk['usageMetadata'] = generate_content_response(self.text)['usageMetadata']
+            event = f"data: {json.dumps(chunk)}\r\n\r\n".encode('utf-8')
+            writer.write(f"{len(event):x}\r\n".encode('latin-1') + event + b'\r\n')
+            await writer.drain()
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
@@ -0,0 +1,267 @@
+"""End-to-end load test of server_ai_takeover:app against local backend stubs.
+
+By default the script:
+
+1. starts a ``BackendStub`` that stands in for Gemini and Supabase REST, with
+   configurable latency, error rate and timeouts;
+2. points the server at it (``LLM_URL``, ``SUPABASE_URL``, ``DB_BACKEND``);
+3. runs ``server_ai_takeover:app`` in-process under uvicorn.
+
+Nothing leaves the machine. With ``--target`` it drives an already running
+server instead; start it against ``backend_stub.py`` yourself.
+
+At each ``--concurrency`` level, that many closed-loop clients replay a
+weighted mix of /predict (seeded synthetic photos), /chat and
+/generate-treatment-plan for ``--duration`` seconds. For each level the
+script reports throughput, error rate, latency percentiles per endpoint, and
+the AI takeover rate of /predict. ``--takeover-threshold`` sets
+AI_FALLBACK_THRESHOLD, for example 101 to send every image to Gemini.
+/predict needs a model file, as in production.
+
+Usage:
+    python benchmarks/load_test.py --concurrency 1 8 32 --duration 20 \\
+        --mix predict=6,chat=3,plan=1 --gemini-latency-ms 800 --error-rate 0.02
+    python benchmarks/load_test.py --target http://127.0.0.1:8000 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from latency import percentile_summary  # noqa: E402
+from backend_stub import BackendStub  # noqa: E402
+from bench_pipeline import synthetic_jpeg  # noqa: E402
+
+ENDPOINTS = ('predict', 'chat', 'plan')
+PLANTS = ['Tomato', 'Potato', 'Pepper', 'Basil', 'Mint', 'Rose', 'Ginger', 'Chili']
+DISEASES = ['Early Blight', 'Late Blight', 'Leaf Spot', 'Powdery Mildew', 'Rust']
+
+
+def parse_mix(mix: str) -> dict:
+    """``'predict=6,chat=3,plan=1'`` -> normalised weights."""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (expected {', '.join(ENDPOINTS)})")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Workload:
+    """Builds request arguments; ``distinct`` bounds how many different inputs repeat."""
+
+    def __init__(self, distinct: int, image_size: tuple, seed: int):
+        self.random = random.Random(seed)
+        self.distinct = distinct
+        self.image_size = image_size
+        self._images = {}
+
+    def image(self, n: int) -> bytes:
+        if n not in self._images:
+            self._images[n] = synthetic_jpeg(*self.image_size, seed=n)
+        return self._images[n]
+
+    def request(self, endpoint: str) -> dict:
+        n = self.random.randrange(self.distinct)
+        user_id = f"load-user-{n % 20}"
+        if endpoint == 'predict':
+            return {'method': 'POST', 'url': '/predict', 'data': {'user_id': user_id},
+                    'files': {'file': (f'plant-{n}.jpg', self.image(n), 'image/jpeg')}}
+        plant, disease = PLANTS[n % len(PLANTS)], DISEASES[n % len(DISEASES)]
+        if endpoint == 'chat':
+            return {'method': 'POST', 'url': '/chat', 'json': {
+                'prompt': f"How do I treat {disease.lower()} on my {plant.lower()}? ({n})",
+                'analysisContext': {'plantName': plant, 'diseaseName': disease},
+            }}
+        return {'method': 'POST', 'url': '/generate-treatment-plan', 'json': {
+            'plantName': f"{plant} {n}", 'diseaseDetected': True, 'diseaseName': disease,
+            'severity': 'Medium', 'symptoms': ['Brown spots', 'Yellowing leaves'],
+            'confidence': 72.5, 'healthScore': 40,
+        }}
+
+
+async def run_level(client: httpx.AsyncClient, workload: Workload, mix: dict, concurrency: int,
+                    duration: float) -> dict:
+    """Closed loop: ``concurrency`` clients, each sending the next request as soon as one finishes."""
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    takeovers = predictions = 0
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal takeovers, predictions
+        while time.perf_counter() < deadline:
+            endpoint = workload.random.choices(names, weights)[0]
+            request = workload.request(endpoint)
+            started = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                status = str(response.status_code)
+            except httpx.TimeoutException:
+                response, status = None, 'timeout'
+            except httpx.HTTPError as e:
+                response, status = None, type(e).__name__
+            latencies[endpoint].append((time.perf_counter() - started) * 1000)
+            statuses[endpoint][status] += 1
+            if endpoint == 'predict' and status == '200':
+                predictions += 1
+                # ML results carry modelType; Gemini takeovers (fresh or reused) do not
+                if 'modelType' not in response.json():
+                    takeovers += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(samples) for samples in latencies.values())
+    ok = sum(counts.get('200', 0) for counts in statuses.values())
+    return {
+        'concurrency': concurrency,
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 2),
+        'error_rate': round(1 - ok / total, 4) if total else 0.0,
+        'takeover_rate': round(takeovers / predictions, 4) if predictions else None,
+        'latency_ms': percentile_summary([ms for samples in latencies.values() for ms in samples]),
+        'endpoints': {
+            endpoint: {
+                'requests': len(latencies[endpoint]),
+                'statuses': dict(statuses[endpoint]),
+                'latency_ms': percentile_summary(latencies[endpoint]),
+            }
+            for endpoint in latencies
+        },
+    }
+
+
+def print_level(result: dict):
+    latency = result['latency_ms']
+    takeover = f"{result['takeover_rate']:.1%}" if result['takeover_rate'] is not None else '-'
+    print(f"{result['concurrency']:>5} {result['requests']:>8} {result['throughput_rps']:>8.1f} "
+          f"{result['error_rate']:>7.1%} {latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f} "
+          f"{takeover:>9}")
+    for endpoint, stats in result['endpoints'].items():
+        latency = stats['latency_ms']
+        statuses = ' '.join(f"{code}x{count}" for code, count in sorted(stats['statuses'].items()))
+        print(f"{'':>5} {endpoint:>8} {stats['requests']:>8}  p50 {latency['p50']:>8.1f}  "
+              f"p95 {latency['p95']:>8.1f}  p99 {latency['p99']:>8.1f}   {statuses}")
+
+
+async def start_server(args, stub: BackendStub):
+    """Run server_ai_takeover:app in this process, wired to ``stub``."""
+    gemini_url = await stub.start()
+    os.environ.update({
+        'LLM_URL': gemini_url,
+        'LLM_API_KEY': 'stub',
+        'SUPABASE_URL': stub.base_url,
+        'SUPABASE_SERVICE_KEY': 'stub',
+        'DB_BACKEND': 'supabase',
+    })
+    if args.takeover_threshold is not None:
+        os.environ['AI_FALLBACK_THRESHOLD'] = str(args.takeover_threshold)
+    # Model and label paths in the server are relative to the repo root
+    os.chdir(ROOT)
+    import uvicorn
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config('server_ai_takeover:app', host='127.0.0.1', port=port,
+                                           log_level=args.server_log_level))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, task
+
+
+async def main_async(args):
+    stub = server = task = None
+    target = args.target
+    if target is None:
+        stub = BackendStub(
+            latency_ms=args.gemini_latency_ms, db_latency_ms=args.db_latency_ms, jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate, timeout_rate=args.timeout_rate, hang_ms=args.hang_ms, seed=args.seed
+        )
+        target, server, task = await start_server(args, stub)
+        print(f"🧪 In-process server at {target}, stubs at {stub.base_url} "
+              f"(Gemini {args.gemini_latency_ms:.0f} ms, DB {args.db_latency_ms:.0f} ms, "
+              f"{args.error_rate:.1%} errors, {args.timeout_rate:.1%} timeouts)")
+
+    workload = Workload(args.distinct, tuple(args.image_size), args.seed or 0)
+    results = []
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    try:
+        async with httpx.AsyncClient(base_url=target, timeout=args.timeout, limits=limits) as client:
+            health = (await client.get('/health')).json()
+            print(f"   /health: {json.dumps(health)[:200]}")
+            print(f"\n{'conc':>5} {'requests':>8} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} "
+                  f"{'p99 ms':>9} {'takeover':>9}")
+            for concurrency in args.concurrency:
+                before = stub.stats() if stub else None
+                result = await run_level(client, workload, args.mix, concurrency, args.duration)
+                if stub:
+                    after = stub.stats()
+                    result['backend_calls'] = {key: after[key] - before[key]
+                                               for key in ('gemini_requests', 'db_requests', 'errors_injected',
+                                                           'timeouts_injected')}
+                results.append(result)
+                print_level(result)
+                if stub:
+                    print(f"{'':>5} backend: {result['backend_calls']}")
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await task
+        if stub is not None:
+            await stub.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', help='Base URL of a running server (default: start one in-process)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--duration', type=float, default=15.0, help='Seconds per concurrency level')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('predict=6,chat=3,plan=1'),
+                        help='Traffic mix as endpoint=weight pairs (predict, chat, plan)')
+    parser.add_argument('--distinct', type=int, default=500,
+                        help='Distinct images / prompts (lower values exercise the caches)')
+    parser.add_argument('--image-size', type=int, nargs=2, default=[1280, 960], metavar=('W', 'H'))
+    parser.add_argument('--timeout', type=float, default=60.0, help='Client timeout per request (s)')
+    parser.add_argument('--takeover-threshold', type=float, default=None,
+                        help='AI_FALLBACK_THRESHOLD for the in-process server')
+    parser.add_argument('--gemini-latency-ms', type=float, default=800.0)
+    parser.add_argument('--db-latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=100.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--hang-ms', type=float, default=25000.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--server-log-level', default='warning')
+    parser.add_argument('--json', help='Also write per-level results to this JSON file')
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
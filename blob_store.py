@@ -0,0 +1,193 @@
+"""Content-addressed storage for uploaded plant photos.
+
+Analyses used to embed the whole upload in ``plant_analyses.image_url`` as a
+``data:image/jpeg;base64,...`` URL, a third larger than the image itself and
+shipped with every history query. Images are now written once under their
+SHA-256 (re-uploads are deduplicated), a small JPEG thumbnail is generated on
+write, and only the resulting URLs are stored in the row.
+
+``LocalBlobStore`` (files under a directory, served by the API) is the
+default; ``SupabaseBlobStore`` puts objects in a Supabase Storage bucket.
+Other object stores only need the four ``BlobStore`` methods.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from llm_image import MIME_TYPES
+
+BLOB_BACKENDS = ('local', 'supabase')
+
+# Extension for each stored mime type
+_EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/webp': 'webp',
+    'image/heic': 'heic',
+    'image/heif': 'heif',
+}
+
+
+def content_type(key: str) -> str:
+    """Mime type of a stored key, from its extension."""
+    extension = key.rsplit('.', 1)[-1].lower()
+    for mime_type, ext in _EXTENSIONS.items():
+        if ext == extension:
+            return mime_type
+    return 'application/octet-stream'
+
+
+class BlobStore:
+    """Interface of a key -> bytes store that can hand out URLs."""
+
+    backend = 'base'
+
+    def __init__(self):
+        self.writes = 0
+        self.dedup_hits = 0
+
+    def put(self, key: str, data: bytes, content_type: str):
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """``(data, content_type)`` or None if the key is absent."""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def url(self, key: str) -> str:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {'backend': self.backend, 'writes': self.writes, 'dedup_hits': self.dedup_hits}
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under ``root``; URLs point at the API's /blobs route."""
+
+    backend = 'local'
+
+    def __init__(self, root: str, base_url: str = '/blobs'):
+        super().__init__()
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip('/')
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    def put(self, key: str, data: bytes, content_type: str):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so a concurrent reader never sees a partial file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.writes += 1
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        return data, content_type(key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class SupabaseBlobStore(BlobStore):
+    """Blobs in a (public) Supabase Storage bucket."""
+
+    backend = 'supabase'
+
+    def __init__(self, client, bucket: str):
+        super().__init__()
+        self.bucket = client.storage.from_(bucket)
+
+    def put(self, key: str, data: bytes, content_type: str):
+        self.bucket.upload(key, data, {'content-type': content_type, 'upsert': 'true'})
+        self.writes += 1
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        try:
+            data = self.bucket.download(key)
+        except Exception:
+            return None
+        return data, content_type(key)
+
+    def exists(self, key: str) -> bool:
+        folder, name = key.rsplit('/', 1)
+        return any(entry.get('name') == name for entry in self.bucket.list(folder, {'search': name}))
+
+    def url(self, key: str) -> str:
+        return self.bucket.get_public_url(key)
+
+
+def create_blob_store(backend: str, root: str = 'blobs', base_url: str = '/blobs',
+                      client=None, bucket: str = 'plant-images') -> BlobStore:
+    """Build the blob store for ``backend`` ('local' or 'supabase')."""
+    if backend == 'local':
+        return LocalBlobStore(root, base_url)
+    if backend == 'supabase':
+        if client is None:
+            raise ValueError("The supabase blob backend needs a connected Supabase client")
+        return SupabaseBlobStore(client, bucket)
+    raise ValueError(f"Unknown blob backend '{backend}' (expected one of {BLOB_BACKENDS})")
+
+
+def make_thumbnail(image_bytes: bytes, max_edge: int = 256, quality: int = 80) -> bytes:
+    """Small upright JPEG preview, decoded in JPEG draft mode."""
+    img = Image.open(io.BytesIO(image_bytes))
+    img.draft('RGB', (max_edge, max_edge))
+    img = ImageOps.exif_transpose(img)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, format='JPEG', quality=quality)
+    return out.getvalue()
+
+
+def save_image(store: BlobStore, image_bytes: bytes, thumbnail_edge: int = 256) -> dict:
+    """Store an upload and its thumbnail under the content hash.
+
+    Returns the image key plus ``image_url`` / ``thumbnail_url``. Already
+    stored content is not written (or thumbnailed) again.
+    """
+    digest = hashlib.sha256(image_bytes).hexdigest()
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        mime_type = MIME_TYPES.get(img.format, 'image/jpeg')
+    prefix = f"{digest[:2]}/{digest}"
+    image_key = f"images/{prefix}.{_EXTENSIONS.get(mime_type, 'jpg')}"
+    thumbnail_key = f"thumbnails/{prefix}.jpg"
+
+    if store.exists(image_key):
+        store.dedup_hits += 1
+    else:
+        # Thumbnail first: an image key that exists always has its thumbnail
+        store.put(thumbnail_key, make_thumbnail(image_bytes, thumbnail_edge), 'image/jpeg')
+        store.put(image_key, image_bytes, mime_type)
+
+    return {
+        'key': image_key,
+        'image_url': store.url(image_key),
+        'thumbnail_url': store.url(thumbnail_key),
+    }
@@ -0,0 +1,55 @@
+"""Bounded worker pools that keep CPU-bound work off the asyncio event loop.
+
+Image decoding/preprocessing and model inference each get their own pool so a
+burst of uploads cannot starve inference (or vice versa), and neither blocks
+lightweight endpoints such as /health, /chat or the stats dashboard.
+"""
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedPool:
+    """A thread or process pool with a cap on queued + running jobs.
+
+    ``max_pending`` applies backpressure: once that many jobs are in flight,
+    further ``run`` calls wait on the event loop instead of piling up work.
+    Process pools pickle ``fn``, so it must be a module-level function.
+    """
+
+    def __init__(self, name: str, workers: int, kind: str = 'thread', max_pending: Optional[int] = None):
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.kind = kind
+        self.max_pending = max_pending or self.workers * 4
+        if kind == 'process':
+            self.executor: Executor = ProcessPoolExecutor(max_workers=self.workers)
+        elif kind == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+        else:
+            raise ValueError(f"Unknown pool kind '{kind}' (expected 'thread' or 'process')")
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self.in_flight = 0
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` in the pool and await its result."""
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+            finally:
+                self.in_flight -= 1
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            'kind': self.kind,
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'in_flight': self.in_flight,
+        }
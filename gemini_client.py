@@ -0,0 +1,149 @@
+"""Shared Gemini (Generative Language API) client.
+
+One long-lived ``httpx.AsyncClient`` is created at startup and closed at
+shutdown, so the AI takeover, /chat and /generate-treatment-plan reuse pooled
+keep-alive connections (and HTTP/2 multiplexing when ``h2`` is installed)
+instead of paying a TCP + TLS handshake on every call. Token accounting and
+response-text extraction live here too, rather than being repeated per
+endpoint.
+"""
+import importlib.util
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# httpx only supports HTTP/2 when the h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+
+
+class GeminiClient:
+    """Pooled client for the ``generateContent`` endpoint."""
+
+    def __init__(self, url: Optional[str], api_key: Optional[str], usage_stats: dict,
+                 max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0, http2: bool = True, timeout: float = 30.0):
+        self.url = url
+        self.api_key = api_key
+        self.usage_stats = usage_stats
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("⚠ HTTP/2 requested but 'h2' is not installed - using HTTP/1.1")
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url and self.api_key)
+
+    def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                headers={'Content-Type': 'application/json'}
+            )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate(self, payload: dict, timeout: Optional[float] = None) -> httpx.Response:
+        """POST a generateContent request on the shared connection pool."""
+        self.start()
+        return await self._client.post(
+            f"{self.url}?key={self.api_key}",
+            json=payload,
+            timeout=timeout if timeout is not None else self.timeout
+        )
+
+    @property
+    def stream_url(self) -> Optional[str]:
+        """The streamGenerateContent URL matching the configured generateContent URL."""
+        if not self.url:
+            return None
+        return self.url.replace(':generateContent', ':streamGenerateContent')
+
+    async def stream(self, payload: dict, timeout: Optional[float] = None) -> AsyncIterator[dict]:
+        """POST a streamGenerateContent request and yield each SSE chunk as a dict.
+
+        Raises ``httpx.HTTPStatusError`` before yielding anything when the
+        upstream status is not 200.
+        """
+        self.start()
+        async with self._client.stream(
+            'POST',
+            f"{self.stream_url}?alt=sse&key={self.api_key}",
+            json=payload,
+            timeout=timeout if timeout is not None else self.timeout
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.startswith('data:'):
+                    yield json.loads(line[5:].strip())
+
+    async def stream_text(self, payload: dict, label: str = 'Gemini',
+                          timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield text deltas as they arrive.
+
+        Token usage is recorded once, from the last ``usageMetadata`` seen,
+        even if the consumer stops reading early.
+        """
+        usage = None
+        try:
+            async for chunk in self.stream(payload, timeout):
+                usage = chunk.get('usageMetadata', usage)
+                text = self.extract_text(chunk)
+                if text:
+                    yield text
+        finally:
+            if usage:
+                self.record_usage({'usageMetadata': usage}, label)
+
+    def record_usage(self, data: dict, label: str = 'Gemini') -> Optional[dict]:
+        """Add ``usageMetadata`` token counts to the usage stats and log them."""
+        metadata = data.get('usageMetadata')
+        if not metadata:
+            return None
+        prompt_tokens = metadata.get('promptTokenCount', 0)
+        completion_tokens = metadata.get('candidatesTokenCount', 0)
+        total_tokens = metadata.get('totalTokenCount', 0)
+
+        self.usage_stats['tokens_input'] += prompt_tokens
+        self.usage_stats['tokens_output'] += completion_tokens
+        self.usage_stats['tokens_used'] += total_tokens
+
+        logger.info(f"🔢 {label} tokens: {prompt_tokens} input + {completion_tokens} output = {total_tokens} total")
+        return {'input': prompt_tokens, 'output': completion_tokens, 'total': total_tokens}
+
+    @staticmethod
+    def extract_text(data: dict) -> Optional[str]:
+        """Text of the first candidate's first part, or None if the shape is unexpected."""
+        candidates = data.get('candidates') or []
+        if not candidates:
+            return None
+        parts = candidates[0].get('content', {}).get('parts', [])
+        if parts and 'text' in parts[0]:
+            return parts[0]['text']
+        return None
+
+    def stats(self) -> dict:
+        return {
+            'http2': self.http2,
+            'max_connections': self.limits.max_connections,
+            'max_keepalive_connections': self.limits.max_keepalive_connections,
+            'keepalive_expiry': self.limits.keepalive_expiry,
+            'open': self._client is not None,
+        }
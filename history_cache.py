@@ -0,0 +1,109 @@
+"""Per-user read-through cache for the history endpoints.
+
+Every history view refetched ``/api/analyses`` or ``/api/plants`` from the
+database. Rendered pages are now kept in a bounded ``ResultCache`` keyed by
+table, user, query parameters and the user's *generation*. A write for that
+user bumps the generation, so the next read for that user misses and its old
+pages age out of the LRU. Nothing needs to be scanned or deleted.
+
+Generations are stamps from one global counter, kept for at most
+``max_users`` recently invalidated (table, user) pairs. When a pair is
+evicted, the ``floor`` rises to at least its stamp, and every pair without
+its own stamp uses the floor. A user's generation therefore never goes
+back to an older value. Evictions only cost extra misses, never stale
+pages.
+
+Each entry stores the serialized body and its ETag. A matching
+``If-None-Match`` gets a 304 with no body.
+
+The cache is per process. With several workers, a write only invalidates the
+worker that made it, and the TTL bounds how stale the others can get.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Optional
+
+from result_cache import ResultCache
+
+
+class HistoryCache:
+    """Cached history pages, invalidated per (table, user)."""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024, ttl_seconds: float = 30, max_entries: int = 5000,
+                 max_users: int = 10000):
+        self.pages = ResultCache(max_bytes=max_bytes, ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self.max_users = max(1, int(max_users))
+        # (table, user_id) -> stamp of its last invalidation, least recently invalidated first
+        self._generations: OrderedDict = OrderedDict()
+        self._clock = 0
+        self._floor = 0
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    def key(self, table: str, user_id: str, *params: Any) -> str:
+        """Cache key for one page; changes whenever the user's data does."""
+        generation = self._generations.get((table, user_id), self._floor)
+        return ResultCache.key(f"{table}:{user_id}".encode('utf-8'), generation, *params)
+
+    def get(self, key: str) -> Optional[dict]:
+        """``{'body', 'etag'}`` for a cached page, or None."""
+        entry = self.pages.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, key: str, entry: dict):
+        self.pages.set(key, entry)
+
+    def invalidate(self, table: str, user_id: str):
+        """Drop every cached page of ``table`` for ``user_id``."""
+        self._clock += 1
+        self._generations[(table, user_id)] = self._clock
+        self._generations.move_to_end((table, user_id))
+        if len(self._generations) > self.max_users:
+            _, stamp = self._generations.popitem(last=False)
+            self._floor = max(self._floor, stamp)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.pages.stats(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'invalidations': self.invalidations,
+            'tracked_users': len(self._generations),
+            'not_modified': self.not_modified,
+        }
+
+
+def render_page(content: Any) -> dict:
+    """Serialize a response body once, with its ETag: ``{'body', 'etag'}``."""
+    body = json.dumps(content, default=str, separators=(',', ':'))
+    return {'body': body, 'etag': make_etag(body)}
+
+
+def make_etag(body: str) -> str:
+    """Strong ETag for a response body."""
+    return '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an ``If-None-Match`` header lists ``etag`` (or ``*``)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate in ('*', etag):
+            return True
+    return False
@@ -0,0 +1,121 @@
+"""Pluggable inference engines for the plant species/disease model.
+
+Every backend exposes the same small interface so the server, the batching
+queue and the tools never touch a framework directly:
+
+* ``load()``         - read the model from disk
+* ``warmup()``       - run one dummy batch (tracing, allocation, compilation)
+* ``infer_batch(x)`` - ``(N, 224, 224, 3)`` float32 -> ``(species_probs, disease_probs)``
+* ``metadata()``     - backend, model path and head layout for status endpoints
+
+This module only depends on NumPy. Backend modules are imported lazily by
+``create_engine`` so that, for example, the ONNX backend runs without
+TensorFlow ever being imported.
+"""
+import json
+import os
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+INPUT_SHAPE = (224, 224, 3)
+
+INFERENCE_BACKENDS = ('keras', 'tflite', 'onnx')
+
+
+def batch_buckets(max_batch_size: int) -> list:
+    """Powers of two up to ``max_batch_size``, plus ``max_batch_size`` itself."""
+    buckets, size = [], 1
+    while size < max_batch_size:
+        buckets.append(size)
+        size *= 2
+    return buckets + [max_batch_size]
+
+
+def pad_to_bucket(batch: np.ndarray, buckets: list) -> np.ndarray:
+    """Zero-pad ``batch`` up to the smallest bucket that holds it."""
+    count = batch.shape[0]
+    size = next(bucket for bucket in buckets if bucket >= count)
+    if size == count:
+        return batch
+    padding = np.zeros((size - count,) + batch.shape[1:], dtype=batch.dtype)
+    return np.concatenate([batch, padding], axis=0)
+
+
+def infer_in_chunks(infer: Callable, batch: np.ndarray, max_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Run ``infer`` on slices of at most ``max_size`` images and join the two heads."""
+    if batch.shape[0] <= max_size:
+        return infer(batch)
+    parts = [infer(batch[i:i + max_size]) for i in range(0, batch.shape[0], max_size)]
+    return (np.concatenate([species for species, _ in parts], axis=0),
+            np.concatenate([disease for _, disease in parts], axis=0))
+
+
+class InferenceEngine:
+    """Base class for inference backends."""
+
+    backend = 'base'
+
+    def __init__(self, model_path: Optional[str] = None):
+        self.model_path = model_path
+        self.dual_head = False
+        self.mode = self.backend
+
+    def load(self):
+        raise NotImplementedError
+
+    def infer_batch(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(species_probs, disease_probs)`` for a preprocessed batch."""
+        raise NotImplementedError
+
+    def warmup(self, batch_size: int = 1):
+        """Run one dummy batch so setup cost is paid before the first request."""
+        self.infer_batch(np.zeros((batch_size,) + INPUT_SHAPE, dtype=np.float32))
+
+    def metadata(self) -> dict:
+        return {
+            'backend': self.backend,
+            'mode': self.mode,
+            'model_path': self.model_path,
+            'dual_head': self.dual_head,
+            'input_shape': list(INPUT_SHAPE),
+        }
+
+
+def read_output_order(model_path: str, num_outputs: int) -> dict:
+    """Read which exported output is the species/disease head from the ``.json`` sidecar."""
+    order = {'species': 0, 'disease': num_outputs - 1}
+    sidecar = os.path.splitext(model_path)[0] + '.json'
+    if os.path.exists(sidecar):
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            order = json.load(f).get('output_order', order)
+    return order
+
+
+def create_engine(backend: str, model_path: str, species_model_path: Optional[str] = None,
+                  mode: str = 'function', num_threads: Optional[int] = None,
+                  max_batch_size: int = 8) -> InferenceEngine:
+    """Instantiate (but do not load) the engine for ``backend``.
+
+    ``max_batch_size`` is the largest batch TFLite pre-allocates for and the
+    Keras traced function is warmed up for.
+    """
+    if backend == 'keras':
+        from keras_engine import KerasEngine
+        return KerasEngine(model_path, species_model_path, mode=mode, max_batch_size=max_batch_size)
+    if backend == 'tflite':
+        from tflite_engine import TFLiteEngine
+        return TFLiteEngine(model_path, num_threads=num_threads, max_batch_size=max_batch_size)
+    if backend == 'onnx':
+        from onnx_engine import OnnxEngine
+        return OnnxEngine(model_path, num_threads=num_threads)
+    raise ValueError(f"Unknown inference backend '{backend}' (expected one of {', '.join(INFERENCE_BACKENDS)})")
+
+
+def top_prediction(probs: np.ndarray, labels: Optional[list], unknown_prefix: str) -> Tuple[str, float]:
+    """Return the best label and its confidence (percent) for one probability row."""
+    idx = int(np.argmax(probs))
+    confidence = float(probs[idx] * 100)
+    if labels and idx < len(labels):
+        return labels[idx], confidence
+    return f'{unknown_prefix}_{idx}', confidence
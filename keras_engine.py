@@ -0,0 +1,140 @@
+"""Keras backend: multi-head EfficientNetB0 served through a traced tf.function.
+
+The disease detector in final_plant_code was built by transfer learning from the
+species classifier (see disease_detect.ipynb): the species model's backbone was
+frozen and a new Dense head was attached to ``base_model.layers[-3].output``.
+Both heads therefore share one feature extractor, so they can be served from a
+single graph with two outputs and the backbone only runs once per image.
+"""
+import logging
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+from inference_engine import INPUT_SHAPE, InferenceEngine, batch_buckets, infer_in_chunks, pad_to_bucket
+
+logger = logging.getLogger(__name__)
+
+# 'predict' - Keras Model.predict (builds a data adapter and runs callbacks per call)
+# 'function' - traced tf.function with a fixed (batch, 224, 224, 3) float32 signature
+# 'xla' - same traced function, JIT-compiled with XLA
+# Both traced modes zero-pad each batch to a fixed bucket (1, 2, 4, ... up to
+# max_batch_size) so XLA compiles one program per bucket, all during warmup,
+# instead of one per micro-batch size seen on live traffic.
+INFERENCE_MODES = ('predict', 'function', 'xla')
+
+
+def build_multi_head_model(disease_model: tf.keras.Model, species_model: tf.keras.Model) -> tf.keras.Model:
+    """Attach the species classifier head to the disease model's backbone.
+
+    Returns a model with outputs ``[species_probs, disease_probs]``. The pooled
+    features feeding the disease head are the same tensor the species head was
+    trained on (Dropout is an identity at inference time).
+    """
+    disease_head = disease_model.layers[-1]
+    features = disease_head.input
+
+    species_dense = species_model.layers[-1]
+    species_head = tf.keras.layers.Dense(
+        species_dense.units,
+        activation=species_dense.activation,
+        name='species_head'
+    )
+    species_output = species_head(features)
+    species_head.set_weights(species_dense.get_weights())
+
+    return tf.keras.Model(
+        inputs=disease_model.input,
+        outputs=[species_output, disease_model.output],
+        name='plant_multi_head'
+    )
+
+
+class KerasEngine(InferenceEngine):
+    """Runs the species and disease heads with a single forward pass."""
+
+    backend = 'keras'
+
+    def __init__(self, model_path: Optional[str] = None, species_model_path: Optional[str] = None,
+                 mode: str = 'function', max_batch_size: int = 8):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode '{mode}' (expected one of {', '.join(INFERENCE_MODES)})")
+        super().__init__(model_path)
+        self.species_model_path = species_model_path
+        self.mode = mode
+        self.buckets = batch_buckets(max(1, int(max_batch_size)))
+        self.model = None
+        self._compiled = None
+
+    @classmethod
+    def from_model(cls, model: tf.keras.Model, dual_head: bool, mode: str = 'function',
+                   max_batch_size: int = 8) -> 'KerasEngine':
+        """Wrap an in-memory model (used by benchmarks and export tools)."""
+        engine = cls(mode=mode, max_batch_size=max_batch_size)
+        engine._set_model(model, dual_head)
+        return engine
+
+    def load(self):
+        """Load the disease model and, if available, graft the species head onto it."""
+        disease_model = tf.keras.models.load_model(self.model_path, compile=False)
+
+        if self.species_model_path and os.path.exists(self.species_model_path):
+            species_model = tf.keras.models.load_model(self.species_model_path, compile=False)
+            self._set_model(build_multi_head_model(disease_model, species_model), dual_head=True)
+            logger.info(f"✓ Multi-head model built (species head from {self.species_model_path})")
+            return
+
+        # Without a species head both label sets read the same output vector,
+        # which is what the server did before - just without the second pass.
+        logger.warning("⚠ Species model not found - species and disease share one output head")
+        self._set_model(disease_model, dual_head=False)
+
+    def _set_model(self, model: tf.keras.Model, dual_head: bool):
+        self.model = model
+        self.dual_head = dual_head
+        self._compiled = None
+        if self.mode != 'predict':
+            self._compiled = tf.function(
+                lambda images: self.model(images, training=False),
+                input_signature=[tf.TensorSpec(shape=(None,) + INPUT_SHAPE, dtype=tf.float32)],
+                jit_compile=(self.mode == 'xla')
+            )
+
+    def _split_heads(self, outputs) -> Tuple[np.ndarray, np.ndarray]:
+        if self.dual_head:
+            species_probs, disease_probs = outputs
+        else:
+            species_probs = disease_probs = outputs
+        return np.asarray(species_probs), np.asarray(disease_probs)
+
+    def _infer_bucket(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        count = batch.shape[0]
+        outputs = self._compiled(tf.convert_to_tensor(pad_to_bucket(batch, self.buckets), dtype=tf.float32))
+        if isinstance(outputs, (list, tuple)):
+            outputs = [output.numpy()[:count] for output in outputs]
+        else:
+            outputs = outputs.numpy()[:count]
+        return self._split_heads(outputs)
+
+    def infer_batch(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(species_probs, disease_probs)`` for a preprocessed batch."""
+        if self._compiled is None:
+            return self._split_heads(self.model.predict(batch, verbose=0))
+        return infer_in_chunks(self._infer_bucket, batch, self.buckets[-1])
+
+    def warmup(self, batch_size: int = 1):
+        """Trace (and for XLA, compile) every batch bucket before the first request."""
+        if self._compiled is None:
+            super().warmup(batch_size)
+            return
+        for size in self.buckets:
+            self._infer_bucket(np.zeros((size,) + INPUT_SHAPE, dtype=np.float32))
+
+    def metadata(self) -> dict:
+        meta = super().metadata()
+        meta['species_model_path'] = self.species_model_path if self.dual_head else None
+        if self._compiled is not None:
+            meta['batch_buckets'] = self.buckets
+        return meta
@@ -0,0 +1,46 @@
+"""Rolling latency samples and percentile summaries for the stats endpoints."""
+from collections import defaultdict, deque
+from typing import Iterable
+
+
+def percentile_summary(samples: Iterable[float]) -> dict:
+    """p50 / p95 / p99 / max of ``samples`` (milliseconds), rounded for JSON."""
+    values = sorted(samples)
+
+    def percentile(p: float) -> float:
+        if not values:
+            return 0.0
+        return round(values[min(len(values) - 1, int(p * len(values)))], 3)
+
+    return {
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+        'max': round(values[-1], 3) if values else 0.0,
+    }
+
+
+class LatencyTracker:
+    """Per-operation call counts, error counts and a window of recent latencies."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self.calls = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    def observe(self, name: str, ms: float, error: bool = False):
+        self._samples[name].append(ms)
+        self.calls[name] += 1
+        if error:
+            self.errors[name] += 1
+
+    def summary(self) -> dict:
+        return {
+            name: {
+                'calls': self.calls[name],
+                'errors': self.errors[name],
+                'latency_ms': percentile_summary(self._samples[name]),
+            }
+            for name in sorted(self.calls)
+        }
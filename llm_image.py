@@ -0,0 +1,88 @@
+"""Shrink uploads before they are sent to Gemini.
+
+The AI takeover used to base64 the original upload (often a multi-megabyte
+phone photo) and always label it ``image/jpeg``. Gemini bills images by
+768x768 tile and gains nothing from pixels beyond that, so the photo is
+decoded near the target size (JPEG draft mode), EXIF-rotated, bounded to a
+maximum edge and re-encoded at a fixed quality with the matching mime type.
+"""
+import io
+import math
+
+from PIL import Image, ImageOps
+
+# Formats Gemini accepts as inline_data, by Pillow format name
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'WEBP': 'image/webp',
+    'HEIC': 'image/heic',
+    'HEIF': 'image/heif',
+}
+
+ENCODE_FORMATS = ('jpeg', 'webp')
+
+# Gemini image tokenisation: one 258-token tile for images up to 384px on both
+# sides, otherwise one per 768x768 tile
+TOKENS_PER_TILE = 258
+SMALL_IMAGE_EDGE = 384
+TILE_EDGE = 768
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Approximate Gemini input tokens for an image of this size."""
+    if width <= SMALL_IMAGE_EDGE and height <= SMALL_IMAGE_EDGE:
+        return TOKENS_PER_TILE
+    return math.ceil(width / TILE_EDGE) * math.ceil(height / TILE_EDGE) * TOKENS_PER_TILE
+
+
+def sniff_mime_type(image_bytes: bytes, default: str = 'image/jpeg') -> str:
+    """Mime type of the encoded image, from its header."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            return MIME_TYPES.get(img.format, default)
+    except Exception:
+        return default
+
+
+def prepare_llm_image(image_bytes: bytes, max_edge: int = 1024, quality: int = 85,
+                      image_format: str = 'jpeg') -> dict:
+    """Downscale and re-encode an upload for Gemini.
+
+    Returns a dict with the bytes to send, their ``mime_type``, the sent and
+    original sizes and estimated image tokens. If re-encoding would not make
+    the image smaller, the original bytes are kept (with their real type).
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    original_format = img.format
+    original_size = img.size
+
+    if max_edge and max(img.size) > max_edge:
+        scale = max_edge / max(img.size)
+        img.draft('RGB', (math.ceil(img.size[0] * scale), math.ceil(img.size[1] * scale)))
+    img = ImageOps.exif_transpose(img)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    if max_edge:
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+    out = io.BytesIO()
+    img.save(out, format=image_format.upper(), quality=quality)
+    data = out.getvalue()
+    mime_type = f"image/{image_format.lower()}"
+    width, height = img.size
+
+    if len(data) >= len(image_bytes) and original_format in MIME_TYPES:
+        data, mime_type = image_bytes, MIME_TYPES[original_format]
+        width, height = original_size
+
+    return {
+        'data': data,
+        'mime_type': mime_type,
+        'width': width,
+        'height': height,
+        'bytes': len(data),
+        'original_bytes': len(image_bytes),
+        'tokens': estimate_image_tokens(width, height),
+        'original_tokens': estimate_image_tokens(*original_size),
+    }
@@ -0,0 +1,248 @@
+"""Minimal Prometheus metrics: counters, gauges and histograms in text format.
+
+A histogram observation is one ``bisect`` into the bucket bounds plus a few
+integer adds, done under no lock. The server runs on a single event loop, so
+the only concurrent writers are the worker-pool threads. Their rare lost
+update on a counter is acceptable for monitoring. Gauges that mirror existing
+state (queue depths, pool occupancy) are callbacks read at scrape time, so
+they cost nothing on the request path.
+
+    STAGE = registry.histogram('stage_seconds', 'Time per stage', ('endpoint', 'stage'))
+    with STAGE.time(endpoint='/predict', stage='decode'):
+        ...
+    registry.render()   # text exposition format 0.0.4
+
+``MetricsMiddleware`` times whole HTTP requests. Code running inside a
+request can read its route with ``current_endpoint()`` and label the
+request with ``set_outcome()``.
+"""
+import contextvars
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; spans a sub-millisecond JSON step up to a slow Gemini call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f'{self.name}{_labels(self.labelnames, key)} {_number(value)}'
+
+
+class Gauge(Metric):
+    """Set/inc/dec gauge, or one whose labelled values come from ``fn()`` at scrape time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], dict]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.fn = fn
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self):
+        values = dict(self._values)
+        if self.fn is not None:
+            # fn returns {label value tuple (or single value): number}
+            for key, value in self.fn().items():
+                values[key if isinstance(key, tuple) else (key,) if self.labelnames else ()] = value
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.labelnames, key)} {_number(value)}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the ``with`` block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f'{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}'
+            yield f'{self.name}_count{_labels(self.labelnames, key)} {cumulative}'
+
+
+class Registry:
+    """Named metrics rendered together for /metrics."""
+
+    def __init__(self, prefix: str = ''):
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self.prefix + name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              fn: Optional[Callable[[], dict]] = None) -> Gauge:
+        return self._register(Gauge(self.prefix + name, documentation, labelnames, fn))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self.prefix + name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.header())
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+class _RequestLabels:
+    __slots__ = ('scope', 'outcome')
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.outcome = 'none'
+
+
+_REQUEST = contextvars.ContextVar('metrics_request', default=None)
+
+
+def current_endpoint() -> str:
+    """Route template of the request being served (``'background'`` outside one)."""
+    request = _REQUEST.get()
+    if request is None:
+        return 'background'
+    # The router stores the matched route in the (shared) scope
+    return getattr(request.scope.get('route'), 'path', None) or 'unmatched'
+
+
+def set_outcome(outcome: str):
+    """Label the current request; requests with several different outcomes become ``'mixed'``."""
+    request = _REQUEST.get()
+    if request is not None:
+        request.outcome = outcome if request.outcome in ('none', outcome) else 'mixed'
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: in-flight gauge and a request duration histogram.
+
+    Not a ``BaseHTTPMiddleware``, so the request context reaches the endpoint
+    and streamed bodies are timed to their last chunk.
+    """
+
+    def __init__(self, app, duration: Histogram, in_flight: Gauge, skip_paths: Sequence[str] = ('/metrics',)):
+        self.app = app
+        self.duration = duration
+        self.in_flight = in_flight
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+        request = _RequestLabels(scope)
+        token = _REQUEST.set(request)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        self.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.in_flight.dec()
+            outcome = request.outcome
+            if outcome == 'none' and status >= 400:
+                outcome = 'error'
+            self.duration.observe(time.perf_counter() - started, endpoint=current_endpoint(),
+                                  method=scope['method'], status=status, outcome=outcome)
+            _REQUEST.reset(token)
@@ -0,0 +1,55 @@
+"""ONNX Runtime backend.
+
+Runs the model exported by ``tools/export_onnx.py`` on the CPU execution
+provider. Neither this module nor ``inference_engine`` imports TensorFlow, so
+a server started with ``INFERENCE_BACKEND=onnx`` never loads it.
+"""
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from inference_engine import InferenceEngine, read_output_order
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEngine(InferenceEngine):
+    """Runs a ``.onnx`` model with a dynamic batch dimension."""
+
+    backend = 'onnx'
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None):
+        super().__init__(model_path)
+        self.num_threads = num_threads
+        self.session = None
+
+    def load(self):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        self.session = ort.InferenceSession(self.model_path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        self._input_name = self.session.get_inputs()[0].name
+        output_names = [output.name for output in self.session.get_outputs()]
+
+        order = read_output_order(self.model_path, len(output_names))
+        self._output_names = [output_names[order['species']], output_names[order['disease']]]
+        self.dual_head = len(output_names) > 1
+        logger.info(f"✓ ONNX model loaded from {self.model_path} (onnxruntime {ort.__version__})")
+
+    def infer_batch(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(species_probs, disease_probs)`` for a preprocessed batch."""
+        # InferenceSession.run is thread-safe
+        species_probs, disease_probs = self.session.run(
+            self._output_names, {self._input_name: batch.astype(np.float32, copy=False)}
+        )
+        return species_probs, disease_probs
+
+    def metadata(self) -> dict:
+        meta = super().metadata()
+        meta['num_threads'] = self.num_threads
+        return meta
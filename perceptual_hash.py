@@ -0,0 +1,80 @@
+"""Perceptual-hash index for reusing AI takeover results on near-duplicate photos.
+
+The exact-byte result cache misses re-shot or re-compressed copies of the same
+leaf. A 64-bit difference hash (dHash) survives resizing, JPEG re-encoding and
+small exposure changes, so two uploads whose hashes differ in only a few bits
+are treated as the same picture and share one Gemini analysis.
+
+Hashes live in a fixed-size ring buffer of packed bits; a lookup XORs the query
+against every stored hash and counts differing bits with a byte popcount table,
+so the whole scan is a handful of NumPy operations.
+"""
+import io
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+HASH_SIZE = 8
+
+# Number of set bits for every byte value
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def dhash(image_bytes: bytes, hash_size: int = HASH_SIZE) -> np.ndarray:
+    """Difference hash of an image as ``hash_size**2 / 8`` packed bytes."""
+    img = Image.open(io.BytesIO(image_bytes))
+    # Let JPEG decode at a fraction of full size; the hash only needs 9x8 pixels
+    img.draft('L', (hash_size * 8, hash_size * 8))
+    img = ImageOps.exif_transpose(img).convert('L')
+    img = img.resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = np.asarray(img, dtype=np.int16)
+    return np.packbits(pixels[:, 1:] > pixels[:, :-1])
+
+
+class PerceptualHashIndex:
+    """Ring buffer of recent hashes with Hamming-distance lookup."""
+
+    def __init__(self, capacity: int = 5000, max_distance: int = 6, ttl_seconds: float = 86400,
+                 hash_size: int = HASH_SIZE):
+        # A zero-slot ring would fail on add(), after the Gemini call was paid for
+        self.capacity = max(1, int(capacity))
+        self.max_distance = max_distance
+        self.ttl = ttl_seconds
+        self._hashes = np.zeros((self.capacity, hash_size * hash_size // 8), dtype=np.uint8)
+        self._expires = np.zeros(self.capacity, dtype=np.float64)  # 0 marks an empty slot
+        self._values = [None] * self.capacity
+        self._next = 0
+        self.lookups = 0
+        self.matches = 0
+
+    def add(self, phash: np.ndarray, value: dict):
+        slot = self._next
+        self._hashes[slot] = phash
+        self._expires[slot] = time.monotonic() + self.ttl
+        self._values[slot] = value
+        self._next = (slot + 1) % self.capacity
+
+    def lookup(self, phash: np.ndarray) -> Optional[Tuple[dict, int]]:
+        """Closest live entry within ``max_distance`` bits, as ``(value, distance)``."""
+        self.lookups += 1
+        live = self._expires > time.monotonic()
+        if not live.any():
+            return None
+        distances = _POPCOUNT[np.bitwise_xor(self._hashes, phash)].sum(axis=1, dtype=np.int32)
+        distances[~live] = np.iinfo(np.int32).max
+        best = int(np.argmin(distances))
+        if distances[best] > self.max_distance:
+            return None
+        self.matches += 1
+        return self._values[best], int(distances[best])
+
+    def stats(self) -> dict:
+        return {
+            'entries': int((self._expires > time.monotonic()).sum()),
+            'capacity': self.capacity,
+            'max_distance': self.max_distance,
+            'lookups': self.lookups,
+            'matches': self.matches,
+        }
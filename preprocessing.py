@@ -0,0 +1,106 @@
+"""Image preprocessing shared by the server, export tools and benchmarks."""
+import io
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+IMAGE_SIZE = (224, 224)
+
+# Files picked up from labeled / calibration dataset folders
+DATASET_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+# Resampling filter of the original decode path (Pillow's default for RGB)
+RESAMPLE = Image.BICUBIC
+
+# Box-reduce by an integer factor before the final resample once the source is
+# more than this many times the target size (non-JPEG formats only)
+REDUCING_GAP = 2.0
+
+# EXIF Orientation tag value -> transpose that makes the image upright
+_EXIF_ORIENTATION = 0x0112
+_TRANSPOSE = {
+    2: Image.FLIP_LEFT_RIGHT,
+    3: Image.ROTATE_180,
+    4: Image.FLIP_TOP_BOTTOM,
+    5: Image.TRANSPOSE,
+    6: Image.ROTATE_270,
+    7: Image.TRANSVERSE,
+    8: Image.ROTATE_90,
+}
+
+
+def decode_resized(image_bytes: bytes, size: tuple = IMAGE_SIZE) -> Image.Image:
+    """Decode straight to ``size`` RGB, doing as little full-resolution work as possible.
+
+    JPEGs are decoded with DCT-domain downscaling (draft mode) to the smallest
+    1/2, 1/4 or 1/8 scale that still covers ``size``, so a 12 MP photo is
+    never materialised at full resolution. Other formats skip the RGB copy
+    when already RGB and use a box pre-reduction before the final resample.
+    EXIF orientation is applied last, on the small image.
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    orientation = img.getexif().get(_EXIF_ORIENTATION, 1)
+
+    if img.format == 'JPEG':
+        img.draft('RGB', size)
+        reducing_gap = None
+    else:
+        reducing_gap = REDUCING_GAP
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img = img.resize(size, RESAMPLE, reducing_gap=reducing_gap)
+
+    # Resize stretches to a fixed size, so transposing afterwards is equivalent
+    if orientation in _TRANSPOSE:
+        img = img.transpose(_TRANSPOSE[orientation])
+    return img
+
+
+def decode_image(image_bytes: bytes, fast: bool = True) -> Image.Image:
+    """Decode to a ``IMAGE_SIZE`` RGB image (``fast=False``: original full-resolution decode)."""
+    if fast:
+        return decode_resized(image_bytes)
+    img = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+    return img.resize(IMAGE_SIZE)
+
+
+def to_tensor(img: Image.Image) -> np.ndarray:
+    """``(1, H, W, 3)`` float32 model input from a decoded image."""
+    arr = np.array(img, dtype=np.float32)
+
+    # EfficientNet preprocessing: the Keras EfficientNet models rescale inside
+    # the graph, so efficientnet.preprocess_input is a pass-through on 0-255 input
+    return np.expand_dims(arr, axis=0)
+
+
+def preprocess_image(image_bytes: bytes, fast: bool = True) -> np.ndarray:
+    """Preprocess image for model prediction.
+
+    ``fast=False`` is the original full-resolution decode (no EXIF handling),
+    kept for parity checks.
+    """
+    return to_tensor(decode_image(image_bytes, fast))
+
+
+def preprocess_image_timed(image_bytes: bytes, fast: bool = True) -> tuple:
+    """``(tensor, decode_seconds, preprocess_seconds)``; timed inside the worker.
+
+    Module-level so it can run in a process pool.
+    """
+    started = time.perf_counter()
+    img = decode_image(image_bytes, fast)
+    decoded = time.perf_counter()
+    tensor = to_tensor(img)
+    return tensor, decoded - started, time.perf_counter() - decoded
+
+
+def list_images(folder: str) -> list:
+    """All image files under ``folder`` (recursively), sorted for reproducibility."""
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith(DATASET_IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
@@ -0,0 +1,304 @@
+"""Async data access for plant analyses and saved plants.
+
+The endpoints used to call the synchronous supabase-py client from ``async``
+handlers, so one slow query stalled every request on the worker.
+``SupabaseRepository`` talks to the project's PostgREST API with one pooled
+``httpx.AsyncClient`` instead; ``SQLiteRepository`` is a local stand-in (a file
+or ``:memory:``) with the same interface for offline development and load
+tests. Every query is timed per operation for the stats endpoints.
+
+History listings use keyset pagination on ``(created_at, id)``: a page is
+"the next ``limit`` rows older than the cursor", which an index on
+``(user_id, created_at DESC, id DESC)`` answers in constant time however long
+the history is. ``fields`` limits the columns returned.
+"""
+import asyncio
+import base64
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+import httpx
+
+from latency import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+DB_BACKENDS = ('supabase', 'sqlite', 'memory')
+
+# Columns that may be requested through ``fields``
+ANALYSIS_FIELDS = (
+    'id', 'user_id', 'image_url', 'thumbnail_url', 'plant_name', 'health_score', 'has_disease', 'disease_name',
+    'confidence', 'severity', 'symptoms', 'recommendations', 'analysis_data', 'created_at',
+)
+PLANT_FIELDS = (
+    'id', 'user_id', 'plant_name', 'plant_type', 'description', 'image_url', 'location',
+    'health_status', 'care_notes', 'last_health_check', 'created_at', 'updated_at',
+)
+
+# ``fields=summary``: what a history list row shows (no analysis_data JSON)
+ANALYSIS_SUMMARY_FIELDS = (
+    'id', 'created_at', 'plant_name', 'health_score', 'has_disease', 'disease_name',
+    'confidence', 'severity', 'image_url', 'thumbnail_url',
+)
+PLANT_SUMMARY_FIELDS = (
+    'id', 'created_at', 'plant_name', 'plant_type', 'health_status', 'image_url', 'last_health_check',
+)
+
+# (created_at, id) of the last row on the previous page
+Cursor = Tuple[str, str]
+
+
+def encode_cursor(row: dict) -> str:
+    """Opaque cursor pointing just past ``row``."""
+    raw = json.dumps([row['created_at'], row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """Inverse of ``encode_cursor``; raises ValueError for anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(row_id, str):
+        raise ValueError('Invalid cursor')
+    return created_at, row_id
+
+
+class Repository:
+    """Interface shared by the database backends."""
+
+    backend = 'base'
+
+    def __init__(self):
+        self.latency = LatencyTracker()
+
+    @asynccontextmanager
+    async def _timed(self, operation: str):
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.latency.observe(operation, (time.perf_counter() - started) * 1000, error)
+
+    async def start(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def insert_analyses(self, records: List[dict]):
+        """Insert plant_analyses rows (one round trip for the whole batch)."""
+        raise NotImplementedError
+
+    async def list_analyses(self, user_id: str, limit: int = 10, fields: Optional[Sequence[str]] = None,
+                            after: Optional[Cursor] = None) -> List[dict]:
+        """A page of a user's analyses, newest first, older than ``after``."""
+        raise NotImplementedError
+
+    async def insert_plant(self, record: dict) -> dict:
+        """Insert a saved_plants row and return it as stored."""
+        raise NotImplementedError
+
+    async def list_plants(self, user_id: str, limit: int = 20, fields: Optional[Sequence[str]] = None,
+                          after: Optional[Cursor] = None) -> List[dict]:
+        """A page of a user's saved plants, newest first, older than ``after``."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {'backend': self.backend, 'queries': self.latency.summary()}
+
+
+class SupabaseRepository(Repository):
+    """PostgREST over a pooled async HTTP/1.1 or HTTP/2 connection."""
+
+    backend = 'supabase'
+
+    def __init__(self, url: str, api_key: str, max_connections: int = 20, max_keepalive: int = 10,
+                 timeout: float = 10.0, http2: bool = False):
+        super().__init__()
+        self.rest_url = f"{url.rstrip('/')}/rest/v1"
+        self.headers = {
+            'apikey': api_key,
+            'Authorization': f"Bearer {api_key}",
+            'Content-Type': 'application/json',
+        }
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.timeout = timeout
+        self.http2 = http2
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.rest_url,
+                headers=self.headers,
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2
+            )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, operation: str, method: str, table: str, **kwargs) -> httpx.Response:
+        await self.start()
+        async with self._timed(operation):
+            response = await self._client.request(method, f"/{table}", **kwargs)
+            response.raise_for_status()
+        return response
+
+    async def insert_analyses(self, records: List[dict]):
+        await self._request('insert_analyses', 'POST', 'plant_analyses', json=records,
+                            headers={'Prefer': 'return=minimal'})
+
+    @staticmethod
+    def _page_params(user_id: str, limit: int, fields: Optional[Sequence[str]], after: Optional[Cursor]) -> dict:
+        params = {
+            'select': ','.join(fields) if fields else '*',
+            'user_id': f"eq.{user_id}",
+            'order': 'created_at.desc,id.desc',
+            'limit': limit,
+        }
+        if after is not None:
+            created_at, row_id = after
+            params['or'] = f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{row_id}"))'
+        return params
+
+    async def list_analyses(self, user_id: str, limit: int = 10, fields: Optional[Sequence[str]] = None,
+                            after: Optional[Cursor] = None) -> List[dict]:
+        response = await self._request('list_analyses', 'GET', 'plant_analyses',
+                                       params=self._page_params(user_id, limit, fields, after))
+        return response.json()
+
+    async def insert_plant(self, record: dict) -> dict:
+        response = await self._request('insert_plant', 'POST', 'saved_plants', json=record,
+                                       headers={'Prefer': 'return=representation'})
+        rows = response.json()
+        return rows[0] if rows else record
+
+    async def list_plants(self, user_id: str, limit: int = 20, fields: Optional[Sequence[str]] = None,
+                          after: Optional[Cursor] = None) -> List[dict]:
+        response = await self._request('list_plants', 'GET', 'saved_plants',
+                                       params=self._page_params(user_id, limit, fields, after))
+        return response.json()
+
+
+class SQLiteRepository(Repository):
+    """Local stand-in: rows kept as JSON in SQLite, queried on one worker thread."""
+
+    backend = 'sqlite'
+
+    def __init__(self, path: str = ':memory:'):
+        super().__init__()
+        self.path = path
+        if path == ':memory:':
+            self.backend = 'memory'
+        # sqlite3 connections are single-threaded; one worker serialises access
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ':memory:':
+            conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS records ('
+            ' tbl TEXT NOT NULL, id TEXT PRIMARY KEY, user_id TEXT,'
+            ' created_at TEXT NOT NULL, data TEXT NOT NULL)'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS records_by_user ON records (tbl, user_id, created_at DESC, id DESC)')
+        conn.commit()
+        return conn
+
+    async def _run(self, operation: str, fn, *args):
+        async with self._timed(operation):
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def start(self):
+        if self._conn is None:
+            self._conn = await asyncio.get_running_loop().run_in_executor(self._executor, self._connect)
+
+    async def aclose(self):
+        if self._conn is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    def _insert(self, table: str, records: List[dict]) -> List[dict]:
+        stored = []
+        for record in records:
+            row = {
+                'id': str(uuid.uuid4()),
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                **record
+            }
+            stored.append(row)
+        self._conn.executemany(
+            'INSERT INTO records (tbl, id, user_id, created_at, data) VALUES (?, ?, ?, ?, ?)',
+            [(table, row['id'], row.get('user_id'), row['created_at'], json.dumps(row, default=str))
+             for row in stored]
+        )
+        self._conn.commit()
+        return stored
+
+    def _select(self, table: str, user_id: str, limit: int, fields: Optional[Sequence[str]],
+                after: Optional[Cursor]) -> List[dict]:
+        query = 'SELECT data FROM records WHERE tbl = ? AND user_id = ?'
+        args = [table, user_id]
+        if after is not None:
+            query += ' AND (created_at < ? OR (created_at = ? AND id < ?))'
+            args += [after[0], after[0], after[1]]
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        rows = self._conn.execute(query, args + [limit]).fetchall()
+        rows = [json.loads(data) for (data,) in rows]
+        if fields:
+            rows = [{field: row.get(field) for field in fields} for row in rows]
+        return rows
+
+    async def insert_analyses(self, records: List[dict]):
+        await self.start()
+        await self._run('insert_analyses', self._insert, 'plant_analyses', records)
+
+    async def list_analyses(self, user_id: str, limit: int = 10, fields: Optional[Sequence[str]] = None,
+                            after: Optional[Cursor] = None) -> List[dict]:
+        await self.start()
+        return await self._run('list_analyses', self._select, 'plant_analyses', user_id, limit, fields, after)
+
+    async def insert_plant(self, record: dict) -> dict:
+        await self.start()
+        rows = await self._run('insert_plant', self._insert, 'saved_plants', [record])
+        return rows[0]
+
+    async def list_plants(self, user_id: str, limit: int = 20, fields: Optional[Sequence[str]] = None,
+                          after: Optional[Cursor] = None) -> List[dict]:
+        await self.start()
+        return await self._run('list_plants', self._select, 'saved_plants', user_id, limit, fields, after)
+
+
+def create_repository(backend: str, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None,
+                      sqlite_path: str = 'plant_data.db', **client_options) -> Repository:
+    """Build the repository for ``backend`` ('supabase', 'sqlite' or 'memory')."""
+    if backend == 'supabase':
+        if not supabase_url or not supabase_key:
+            raise ValueError("The supabase backend needs SUPABASE_URL and SUPABASE_SERVICE_KEY")
+        return SupabaseRepository(supabase_url, supabase_key, **client_options)
+    if backend == 'sqlite':
+        return SQLiteRepository(sqlite_path)
+    if backend == 'memory':
+        return SQLiteRepository(':memory:')
+    raise ValueError(f"Unknown database backend '{backend}' (expected one of {DB_BACKENDS})")
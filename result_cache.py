@@ -0,0 +1,74 @@
+"""Content-addressed LRU + TTL cache for final /predict analyses.
+
+Keys are a SHA-256 of the uploaded bytes combined with everything that can
+change the answer for those bytes (model version, takeover threshold, feature
+flags), so a re-uploaded photo is served without decoding, inference or a
+Gemini call. Eviction is bounded by the approximate serialized size of the
+stored analyses, not just the entry count.
+"""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class ResultCache:
+    """Memory-bounded LRU cache with per-entry expiry."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 3600, max_entries: int = 10000):
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.total_bytes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(content: bytes, *settings: Any) -> str:
+        """Hash of the content plus the settings that affect the result."""
+        digest = hashlib.sha256(content)
+        for setting in settings:
+            digest.update(b'\0' + str(setting).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at, size = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: dict):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.total_bytes -= size
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+            'evictions': self.evictions,
+        }
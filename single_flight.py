@@ -0,0 +1,91 @@
+"""Single-flight coalescing of identical in-flight LLM requests.
+
+When many clients ask for the same thing at once (a trending diagnosis, the
+same chat question about the same analysis, the same photo sent twice), only
+the first caller reaches Gemini; everyone else awaits that one upstream call.
+Successful results are then kept for a short TTL so a burst arriving just
+after completion is served as well.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key onto one task."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 1000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._results: "OrderedDict[str, tuple]" = OrderedDict()
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """Stable hash of the normalized request parts."""
+        raw = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def peek(self, key: str) -> Any:
+        """Cached result for ``key`` if still fresh, else None (never calls upstream)."""
+        cached = self._results.get(key)
+        if cached is None or cached[1] < time.monotonic():
+            return None
+        self.cache_hits += 1
+        return cached[0]
+
+    def remember(self, key: str, value: Any):
+        """Store a result obtained outside ``do`` (e.g. assembled from a stream)."""
+        if value is None:
+            return
+        self._results[key] = (value, time.monotonic() + self.ttl)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await fn()``, sharing one call among concurrent identical keys.
+
+        ``None`` results and exceptions are passed to every waiter but never
+        cached, so the next request retries upstream.
+        """
+        cached = self._results.get(key)
+        if cached is not None:
+            value, expires_at = cached
+            if expires_at >= time.monotonic():
+                self.cache_hits += 1
+                return value
+            del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.upstream_calls += 1
+            task = asyncio.get_running_loop().create_task(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        # shield: a disconnecting caller must not cancel the shared upstream call
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        self.remember(key, task.result())
+
+    def stats(self) -> dict:
+        return {
+            'in_flight': len(self._in_flight),
+            'cached': len(self._results),
+            'ttl_seconds': self.ttl,
+            'upstream_calls': self.upstream_calls,
+            'coalesced': self.coalesced,
+            'cache_hits': self.cache_hits,
+        }
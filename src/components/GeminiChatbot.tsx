@@ -108,6 +108,56 @@ Keep responses concise but informative. If asked about treatment, provide step-b
     return systemPrompt;
   };
 
+  // Reads /chat/stream (Server-Sent Events) into a growing assistant message.
+  // Returns false if streaming is unavailable so the caller can use /chat.
+  const streamReply = async (body: string): Promise<boolean> => {
+    let response: Response;
+    try {
+      response = await fetch(`http://localhost:8000/chat/stream`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body
+      });
+    } catch {
+      return false;
+    }
+    if (!response.ok || !response.body) return false;
+
+    setMessages(prev => [...prev, { role: 'assistant', content: '', timestamp: new Date() }]);
+    setIsLoading(false);
+    const appendText = (text: string) => {
+      setMessages(prev => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+      });
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split('\n\n');
+      buffer = events.pop() || '';
+      for (const raw of events) {
+        const event = raw.match(/^event: (.*)$/m)?.[1];
+        const data = raw.match(/^data: (.*)$/m)?.[1];
+        if (!data) continue;
+        const payload = JSON.parse(data);
+        if (event === 'error') {
+          appendText('\n\n❌ The response was interrupted. Please try again.');
+        } else if (!event && payload.text) {
+          appendText(payload.text);
+        }
+      }
+    }
+    return true;
+  };
+
   const sendMessage = async () => {
     if (!input.trim() || isLoading) return;
 
@@ -132,31 +182,36 @@ Keep responses concise but informative. If asked about treatment, provide step-b
 
       const fullPrompt = `${systemPrompt}\n\nConversation History:\n${conversationHistory}\n\nUser: ${input}\n\nAssistant:`;
 
-      // Call Gemini API
-      const response = await fetch(`http://localhost:8000/chat`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          prompt: fullPrompt,
-          analysisContext: analysisContext
-        })
+      const body = JSON.stringify({
+        prompt: fullPrompt,
+        analysisContext: analysisContext
       });
 
-      if (!response.ok) {
-        throw new Error('Failed to get response from chatbot');
-      }
+      // Stream the reply token by token; fall back to the buffered endpoint
+      const streamed = await streamReply(body);
+      if (!streamed) {
+        const response = await fetch(`http://localhost:8000/chat`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body
+        });
 
-      const data = await response.json();
-      
-      const assistantMessage: Message = {
-        role: 'assistant',
-        content: data.response || 'I apologize, but I encountered an error. Please try again.',
-        timestamp: new Date()
-      };
+        if (!response.ok) {
+          throw new Error('Failed to get response from chatbot');
+        }
 
-      setMessages(prev => [...prev, assistantMessage]);
+        const data = await response.json();
+        
+        const assistantMessage: Message = {
+          role: 'assistant',
+          content: data.response || 'I apologize, but I encountered an error. Please try again.',
+          timestamp: new Date()
+        };
+
+        setMessages(prev => [...prev, assistantMessage]);
+      }
     } catch (error) {
       console.error('Chat error:', error);
       const errorMessage: Message = {
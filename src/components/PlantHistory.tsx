@@ -8,6 +8,7 @@ import { supabase } from '@/integrations/supabase/client';
 interface PlantAnalysis {
   id: string;
   image_url: string;
+  thumbnail_url?: string | null;
   plant_name: string;
   health_score: number;
   has_disease: boolean;
@@ -16,6 +17,7 @@ interface PlantAnalysis {
   severity: string;
   symptoms: string[];
   recommendations: string[];
+  analysis_data?: { thumbnailUrl?: string } | null;
   created_at: string;
 }
 
@@ -287,7 +289,8 @@ Report generated by Plant Health AI - Disease Detection System
               {analysis.image_url && (
                 <div className="relative aspect-square rounded-lg overflow-hidden bg-gray-100">
                   <img
-                    src={analysis.image_url}
+                    src={analysis.thumbnail_url || analysis.analysis_data?.thumbnailUrl || analysis.image_url}
+                    loading="lazy"
                     alt={analysis.plant_name || 'Plant'}
                     className="w-full h-full object-cover"
                     onError={(e) => {
@@ -57,18 +57,29 @@ const TreatmentGuide = ({ analysis, imageUrl }: TreatmentGuideProps) => {
   const fetchAITreatmentPlan = async () => {
     setIsLoadingAI(true);
     try {
+      const body = JSON.stringify({
+        plantName: analysis.plantName,
+        diseaseDetected: analysis.diseaseDetected,
+        diseaseName: analysis.diseaseName,
+        severity: analysis.severity,
+        symptoms: analysis.symptoms,
+        confidence: analysis.confidence,
+        healthScore: analysis.healthScore
+      });
+
+      // Render sections as they stream in; fall back to the buffered endpoint
+      if (await streamAITreatmentPlan(body)) {
+        toast({
+          title: '🤖 AI Treatment Plan Generated',
+          description: 'Personalized care instructions ready!'
+        });
+        return;
+      }
+
       const response = await fetch('http://localhost:8000/generate-treatment-plan', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          plantName: analysis.plantName,
-          diseaseDetected: analysis.diseaseDetected,
-          diseaseName: analysis.diseaseName,
-          severity: analysis.severity,
-          symptoms: analysis.symptoms,
-          confidence: analysis.confidence,
-          healthScore: analysis.healthScore
-        })
+        body
       });
 
       if (!response.ok) {
@@ -102,6 +113,72 @@ const TreatmentGuide = ({ analysis, imageUrl }: TreatmentGuideProps) => {
     }
   };
 
+  const stepStyles: Record<number, { icon: React.ReactNode; color: string }> = {
+    0: { icon: <AlertCircle className="h-5 w-5" />, color: 'text-red-500' },
+    1: { icon: <Droplet className="h-5 w-5" />, color: 'text-blue-500' },
+    4: { icon: <Sun className="h-5 w-5" />, color: 'text-yellow-500' },
+    8: { icon: <Sparkles className="h-5 w-5" />, color: 'text-green-500' },
+    15: { icon: <Check className="h-5 w-5" />, color: 'text-emerald-500' }
+  };
+
+  // Reads /generate-treatment-plan/stream (NDJSON, one event per completed
+  // section). Returns false if streaming is unavailable so the caller can
+  // use the buffered endpoint instead.
+  const streamAITreatmentPlan = async (body: string): Promise<boolean> => {
+    let response: Response;
+    try {
+      response = await fetch('http://localhost:8000/generate-treatment-plan/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body
+      });
+    } catch {
+      return false;
+    }
+    if (!response.ok || !response.body) return false;
+
+    const steps: TreatmentStep[] = [];
+    setCareTips({
+      watering: 'Water when top inch of soil is dry',
+      light: 'Provide bright indirect light',
+      environment: 'Maintain 65-75°F with good air circulation'
+    });
+
+    const handleEvent = (event: any) => {
+      if (event.type === 'section' && event.actions?.length) {
+        const day = event.day ?? steps.length;
+        const style = stepStyles[day] ?? stepStyles[8];
+        steps.push({ day, title: event.title, actions: event.actions, ...style });
+        setTreatmentSteps([...steps]);
+        setIsLoadingAI(false);
+      } else if (event.type === 'tip') {
+        if (event.key === 'watering_tip') setCareTips(prev => ({ ...prev, watering: event.text }));
+        else if (event.key === 'light_tip') setCareTips(prev => ({ ...prev, light: event.text }));
+        else if (event.key === 'temperature_tip' || event.key === 'environment_tip') setCareTips(prev => ({ ...prev, environment: event.text }));
+        else if (event.key.startsWith('recovery')) setRecoveryPrediction(event.text);
+      } else if (event.type === 'done') {
+        setAiPlan(event.treatmentPlan);
+        if (steps.length === 0) parseAITreatmentPlan(event.treatmentPlan);
+      } else if (event.type === 'error') {
+        throw new Error(event.detail || 'Failed to generate AI treatment plan');
+      }
+    };
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop() || '';
+      lines.filter(line => line.trim()).forEach(line => handleEvent(JSON.parse(line)));
+    }
+    if (buffer.trim()) handleEvent(JSON.parse(buffer));
+    return true;
+  };
+
   const parseAITreatmentPlan = (plan: string) => {
     const timeline: TreatmentStep[] = [];
     
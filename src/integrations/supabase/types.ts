@@ -78,6 +78,7 @@ export type Database = {
           recommendations: string[] | null
           severity: string | null
           symptoms: string[] | null
+          thumbnail_url: string | null
           user_id: string
         }
         Insert: {
@@ -93,6 +94,7 @@ export type Database = {
           recommendations?: string[] | null
           severity?: string | null
           symptoms?: string[] | null
+          thumbnail_url?: string | null
           user_id: string
         }
         Update: {
@@ -108,6 +110,7 @@ export type Database = {
           recommendations?: string[] | null
           severity?: string | null
           symptoms?: string[] | null
+          thumbnail_url?: string | null
           user_id?: string
         }
         Relationships: []
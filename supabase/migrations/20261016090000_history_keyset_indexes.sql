@@ -0,0 +1,7 @@
+-- Keyset pagination for the history endpoints: each page is
+-- WHERE user_id = ? AND (created_at, id) < cursor ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_plant_analyses_user_history
+  ON public.plant_analyses (user_id, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_saved_plants_user_history
+  ON public.saved_plants (user_id, created_at DESC, id DESC);
@@ -0,0 +1,7 @@
+-- History list rows (fields=summary) show a thumbnail without fetching the
+-- analysis_data JSON, so the URL gets its own column
+ALTER TABLE public.plant_analyses ADD COLUMN IF NOT EXISTS thumbnail_url TEXT;
+
+UPDATE public.plant_analyses
+  SET thumbnail_url = analysis_data->>'thumbnailUrl'
+  WHERE thumbnail_url IS NULL AND analysis_data ? 'thumbnailUrl';
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batching import MicroBatcher  # noqa: E402
+
+
+def run_batches(workers: int, requests: int = 8) -> tuple:
+    """Peak concurrent infer_fn calls and the per-request results."""
+    running = peak = 0
+    lock = threading.Lock()
+
+    def infer(batch):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return (batch.sum(axis=(1, 2, 3)),)
+
+    async def scenario():
+        batcher = MicroBatcher(infer, max_batch_size=2, max_wait_ms=1,
+                               executor=ThreadPoolExecutor(workers), max_concurrent_batches=workers)
+        tensors = [np.full((1, 2, 2, 3), i, dtype=np.float32) for i in range(requests)]
+        results = await asyncio.gather(*(batcher.submit(t) for t in tensors))
+        await batcher.stop()
+        return [float(out[0][0]) for out in results]
+
+    results = asyncio.run(scenario())
+    return peak, results
+
+
+def test_batches_run_in_parallel_up_to_the_pool_size():
+    peak, results = run_batches(workers=4)
+    assert peak == 4
+    assert results == [i * 12.0 for i in range(8)]
+
+
+def test_single_worker_runs_one_batch_at_a_time():
+    peak, results = run_batches(workers=1)
+    assert peak == 1
+    assert results == [i * 12.0 for i in range(8)]
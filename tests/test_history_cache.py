@@ -0,0 +1,34 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_cache import HistoryCache, render_page  # noqa: E402
+
+
+def test_invalidate_changes_only_that_users_key():
+    cache = HistoryCache()
+    alice, bob = cache.key('plant_analyses', 'alice', 20), cache.key('plant_analyses', 'bob', 20)
+    cache.invalidate('plant_analyses', 'alice')
+    assert cache.key('plant_analyses', 'alice', 20) != alice
+    assert cache.key('plant_analyses', 'bob', 20) == bob
+
+
+def test_generations_are_bounded_and_never_serve_stale_pages():
+    cache = HistoryCache(max_users=3)
+    cache.set(cache.key('plant_analyses', 'u0'), render_page(['old']))
+    cache.invalidate('plant_analyses', 'u0')
+    fresh = cache.key('plant_analyses', 'u0')
+    cache.set(fresh, render_page(['new']))
+
+    for i in range(1, 100):
+        cache.invalidate('plant_analyses', f'u{i}')
+    assert cache.stats()['tracked_users'] == 3
+
+    # u0 was evicted: its key moved on (a miss), and never back to the pre-write page
+    key = cache.key('plant_analyses', 'u0')
+    assert key != fresh
+    assert cache.get(key) is None
+    cache.set(key, render_page(['new']))
+    cache.invalidate('plant_analyses', 'u0')
+    assert cache.get(cache.key('plant_analyses', 'u0')) is None
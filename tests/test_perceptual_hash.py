@@ -0,0 +1,19 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from perceptual_hash import PerceptualHashIndex  # noqa: E402
+
+
+def test_zero_capacity_still_accepts_adds():
+    index = PerceptualHashIndex(capacity=0)
+    first = np.zeros(8, dtype=np.uint8)
+    second = np.full(8, 0xFF, dtype=np.uint8)
+    index.add(first, {'plantName': 'a'})
+    index.add(second, {'plantName': 'b'})
+    assert index.stats()['capacity'] == 1
+    assert index.lookup(second) == ({'plantName': 'b'}, 0)
+    assert index.lookup(first) is None
@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tflite_engine  # noqa: E402
+from inference_engine import INPUT_SHAPE, batch_buckets  # noqa: E402
+from tflite_engine import TFLiteEngine  # noqa: E402
+
+
+class FakeInterpreter:
+    """Two float32 heads: the per-image pixel sum and its negation."""
+
+    allocations = 0
+
+    def __init__(self, model_path, num_threads=None):
+        self.shape = [1] + list(INPUT_SHAPE)
+
+    def resize_tensor_input(self, index, shape):
+        self.shape = list(shape)
+
+    def allocate_tensors(self):
+        FakeInterpreter.allocations += 1
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': np.array(self.shape), 'dtype': np.float32, 'quantization': (0.0, 0)}]
+
+    def get_output_details(self):
+        return [{'index': i, 'dtype': np.float32, 'quantization': (0.0, 0)} for i in (1, 2)]
+
+    def set_tensor(self, index, value):
+        assert list(value.shape) == self.shape
+        self.value = value
+
+    def invoke(self):
+        self.sums = self.value.reshape(len(self.value), -1).sum(axis=1, keepdims=True)
+
+    def get_tensor(self, index):
+        return self.sums if index == 1 else -self.sums
+
+
+def test_batch_buckets():
+    assert batch_buckets(1) == [1]
+    assert batch_buckets(8) == [1, 2, 4, 8]
+    assert batch_buckets(12) == [1, 2, 4, 8, 12]
+
+
+def test_varying_batch_sizes_do_not_reallocate(monkeypatch):
+    monkeypatch.setattr(tflite_engine, 'Interpreter', FakeInterpreter)
+    engine = TFLiteEngine('model.tflite', max_batch_size=8)
+    engine.load()
+    engine.warmup()
+    allocated = FakeInterpreter.allocations
+
+    for size in (3, 1, 7, 2, 5, 8, 11):
+        batch = np.stack([np.full(INPUT_SHAPE, i, dtype=np.float32) for i in range(size)])
+        species, disease = engine.infer_batch(batch)
+        expected = np.arange(size, dtype=np.float32)[:, None] * np.prod(INPUT_SHAPE)
+        assert species.shape == (size, 1)
+        np.testing.assert_allclose(species, expected)
+        np.testing.assert_allclose(disease, -expected)
+
+    assert FakeInterpreter.allocations == allocated
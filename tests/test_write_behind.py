@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from write_behind import WriteBehindQueue  # noqa: E402
+
+
+def read_spill(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_drain_during_backoff_spills_in_flight_batch(tmp_path):
+    spill = str(tmp_path / 'spill.jsonl')
+
+    async def db_down(records):
+        raise RuntimeError('db down')
+
+    async def scenario():
+        queue = WriteBehindQueue('test', db_down, max_batch_size=10, flush_interval_ms=0,
+                                 max_retries=5, backoff_base=30.0, spill_path=spill)
+        queue.put({'n': 1})
+        queue.put({'n': 2})
+        # Let the flush task take the batch, fail once and start backing off
+        await asyncio.sleep(0.05)
+        assert queue.stats()['queue_depth'] == 0
+        await queue.drain()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert read_spill(spill) == [{'n': 1}, {'n': 2}]
+    assert queue.stats()['spilled'] == 2
+
+
+def test_drain_during_slow_insert_writes_in_flight_batch(tmp_path):
+    written = []
+    calls = 0
+
+    async def slow_then_ok(records):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(30)
+        written.extend(records)
+
+    async def scenario():
+        queue = WriteBehindQueue('test', slow_then_ok, flush_interval_ms=0,
+                                 spill_path=str(tmp_path / 'spill.jsonl'))
+        queue.put({'n': 1})
+        await asyncio.sleep(0.05)
+        await queue.drain()
+
+    asyncio.run(scenario())
+    assert written == [{'n': 1}]
+    assert not os.path.exists(tmp_path / 'spill.jsonl')
+
+
+def test_overflow_spills_without_blocking(tmp_path):
+    spill = str(tmp_path / 'spill.jsonl')
+
+    async def never(records):
+        await asyncio.sleep(30)
+
+    async def scenario():
+        queue = WriteBehindQueue('test', never, max_batch_size=100, flush_interval_ms=10000,
+                                 max_pending=1, spill_path=spill)
+        queue.put({'n': 1})
+        queue.put({'n': 2})
+        await asyncio.sleep(0.1)
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert read_spill(spill) == [{'n': 2}]
+    assert queue.stats()['spilled'] == 1
+
+
+def test_drain_waits_for_overflow_spill(tmp_path):
+    spill = str(tmp_path / 'spill.jsonl')
+    written, spill_calls = [], []
+
+    async def ok(records):
+        written.extend(records)
+
+    async def scenario():
+        queue = WriteBehindQueue('test', ok, max_batch_size=100, flush_interval_ms=10000,
+                                 max_pending=1, spill_path=spill)
+        write_spill = queue._write_spill
+        queue._write_spill = lambda records: spill_calls.append(len(records)) or write_spill(records)
+        queue.put({'n': 1})
+        for n in range(2, 6):
+            queue.put({'n': n})
+        # No yield to the loop before shutdown: drain() must still wait for the spill
+        await queue.drain()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert written == [{'n': 1}]
+    assert read_spill(spill) == [{'n': n} for n in range(2, 6)]
+    assert queue.stats()['spilled'] == 4
+    # One write (and fsync) for the whole overflow burst
+    assert spill_calls == [4]
@@ -0,0 +1,119 @@
+"""TFLite backend for exported (optionally quantized) models.
+
+Uses the standalone ``tflite_runtime`` interpreter when it is installed so the
+server can run without TensorFlow; falls back to ``tf.lite`` otherwise.
+"""
+import logging
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from inference_engine import (INPUT_SHAPE, InferenceEngine, batch_buckets, infer_in_chunks, pad_to_bucket,
+                              read_output_order)
+
+try:
+    from tflite_runtime.interpreter import Interpreter
+except ImportError:
+    Interpreter = None
+
+logger = logging.getLogger(__name__)
+
+
+class TFLiteEngine(InferenceEngine):
+    """Runs a ``.tflite`` model written by ``tools/export_tflite.py``.
+
+    Resizing the input means ``allocate_tensors()``, which rebuilds the
+    interpreter's arena. Micro-batches change size on almost every flush, so
+    each batch is zero-padded up to a fixed bucket (1, 2, 4, ... up to
+    ``max_batch_size``). Each bucket has its own interpreter, allocated once,
+    and the outputs are sliced back to the real batch size.
+    """
+
+    backend = 'tflite'
+
+    def __init__(self, model_path: str, num_threads: Optional[int] = None, max_batch_size: int = 8):
+        super().__init__(model_path)
+        self.num_threads = num_threads
+        self.buckets = batch_buckets(max(1, int(max_batch_size)))
+        self.interpreter = None
+        # bucket size -> (interpreter, lock); an interpreter is stateful and not thread-safe
+        self._interpreters = {}
+        self._lock = threading.Lock()
+        self.allocations = 0
+
+    def _create_interpreter(self, batch_size: Optional[int] = None):
+        interpreter_cls = Interpreter
+        if interpreter_cls is None:
+            import tensorflow as tf
+            interpreter_cls = tf.lite.Interpreter
+        interpreter = interpreter_cls(model_path=self.model_path, num_threads=self.num_threads)
+        if batch_size is not None:
+            interpreter.resize_tensor_input(self._input['index'], [batch_size] + list(self._input['shape'][1:]))
+        interpreter.allocate_tensors()
+        self.allocations += 1
+        return interpreter
+
+    def load(self):
+        self.interpreter = self._create_interpreter()
+        self._input = self.interpreter.get_input_details()[0]
+        outputs = self.interpreter.get_output_details()
+        if int(self._input['shape'][0]) in self.buckets:
+            self._interpreters[int(self._input['shape'][0])] = (self.interpreter, threading.Lock())
+
+        order = read_output_order(self.model_path, len(outputs))
+        self._species_output = outputs[order['species']]
+        self._disease_output = outputs[order['disease']]
+        self.dual_head = len(outputs) > 1
+        logger.info(f"✓ TFLite model loaded from {self.model_path} (input {self._input['dtype'].__name__}, "
+                    f"batch buckets {self.buckets})")
+
+    def _bucket(self, size: int) -> tuple:
+        """The (interpreter, lock) for ``size``, allocating it on first use only."""
+        with self._lock:
+            if size not in self._interpreters:
+                self._interpreters[size] = (self._create_interpreter(size), threading.Lock())
+            return self._interpreters[size]
+
+    def _quantize(self, batch: np.ndarray) -> np.ndarray:
+        dtype = self._input['dtype']
+        if dtype == np.float32:
+            return batch.astype(np.float32, copy=False)
+        scale, zero_point = self._input['quantization']
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    @staticmethod
+    def _read(interpreter, detail: dict) -> np.ndarray:
+        out = interpreter.get_tensor(detail['index'])
+        if detail['dtype'] != np.float32:
+            scale, zero_point = detail['quantization']
+            out = (out.astype(np.float32) - zero_point) * scale
+        return out
+
+    def _infer_bucket(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        count = batch.shape[0]
+        batch = pad_to_bucket(batch, self.buckets)
+        interpreter, lock = self._bucket(batch.shape[0])
+        with lock:
+            interpreter.set_tensor(self._input['index'], self._quantize(batch))
+            interpreter.invoke()
+            # Copies: the output buffers are reused by the next invoke()
+            return (self._read(interpreter, self._species_output)[:count].copy(),
+                    self._read(interpreter, self._disease_output)[:count].copy())
+
+    def infer_batch(self, batch: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return ``(species_probs, disease_probs)`` for a preprocessed batch."""
+        return infer_in_chunks(self._infer_bucket, batch, self.buckets[-1])
+
+    def warmup(self, batch_size: int = 1):
+        """Allocate and run every batch bucket so none is set up on the request path."""
+        for size in self.buckets:
+            self._infer_bucket(np.zeros((size,) + INPUT_SHAPE, dtype=np.float32))
+
+    def metadata(self) -> dict:
+        meta = super().metadata()
+        meta['num_threads'] = self.num_threads
+        meta['batch_buckets'] = self.buckets
+        meta['allocations'] = self.allocations
+        return meta
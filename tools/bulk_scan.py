@@ -0,0 +1,294 @@
+"""Re-score a directory of plant photos offline, without the HTTP server.
+
+Walks ``--input-dir`` recursively in a stable order. Images are read and
+decoded by ``preprocess_image`` in a process pool, one batch per task. At
+most ``--prefetch`` decoded batches are in flight, so memory is bounded by
+``prefetch x batch-size`` images however large the corpus is. The model runs
+each batch in one call. ``create_dual_model_analysis`` and the server's label
+files produce the same fields /predict returns.
+
+Output is a CSV file, or a Parquet dataset directory (``--output scans.parquet``,
+needs pyarrow). CSV rows are written as batches finish. Parquet rows are
+buffered and written as one part file per ``--rows-per-part`` rows, or after
+``--part-seconds`` if that comes first, so a killed scan loses at most that
+much work (Ctrl-C still writes the buffered rows). A re-run with the same
+output skips every image already recorded, so an interrupted scan resumes
+where it stopped. Unreadable images get a row with ``error`` set instead of
+stopping the scan.
+
+Usage:
+    python tools/bulk_scan.py --input-dir /data/nursery --output scans.csv
+    python tools/bulk_scan.py --input-dir /data/nursery --output scans.parquet \\
+        --backend onnx --model final_plant_code/plant_multi_head.onnx --batch-size 64 --workers 8
+"""
+import argparse
+import csv
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from analysis import create_dual_model_analysis, load_labels  # noqa: E402
+from batch_upload import IMAGE_EXTENSIONS  # noqa: E402
+from inference_engine import INFERENCE_BACKENDS, create_engine, top_prediction  # noqa: E402
+from preprocessing import preprocess_image  # noqa: E402
+
+COLUMNS = [
+    'path', 'plant_name', 'species_label', 'disease_label', 'disease_detected', 'disease_name',
+    'confidence', 'species_confidence', 'disease_confidence', 'severity', 'health_score',
+    'low_confidence', 'error',
+]
+# Parquet column types; every other column is a string. Fixed rather than
+# inferred, so parts with no errors (or only errors) still share one schema.
+BOOL_COLUMNS = {'disease_detected', 'low_confidence'}
+FLOAT_COLUMNS = {'confidence', 'species_confidence', 'disease_confidence', 'health_score'}
+
+
+def walk_images(root: str):
+    """Relative paths of every image under ``root``, lazily, in sorted order."""
+    for folder, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.relpath(os.path.join(folder, name), root)
+
+
+def decode_batch(root: str, paths: list, fast: bool) -> tuple:
+    """Worker: ``(decoded paths, (N, 224, 224, 3) tensor or None, [(path, error)])``."""
+    ok, tensors, errors = [], [], []
+    for path in paths:
+        try:
+            with open(os.path.join(root, path), 'rb') as f:
+                tensors.append(preprocess_image(f.read(), fast))
+            ok.append(path)
+        except Exception as e:
+            errors.append((path, str(e) or type(e).__name__))
+    return ok, np.concatenate(tensors, axis=0) if tensors else None, errors
+
+
+class CsvSink:
+    """Appends rows to one CSV file, flushed after every batch."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def done_paths(self) -> set:
+        if not os.path.exists(self.path):
+            return set()
+        # Drop a half-written last line left by a crash
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b'\n'):
+                f.truncate(data.rfind(b'\n') + 1)
+        with open(self.path, newline='', encoding='utf-8') as f:
+            return {row['path'] for row in csv.DictReader(f)}
+
+    def open(self):
+        is_new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        if is_new:
+            self._writer.writeheader()
+
+    def write(self, rows: list):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes ``part-NNNNN.parquet`` files into a dataset directory."""
+
+    def __init__(self, path: str, rows_per_part: int, part_seconds: float):
+        import pyarrow
+        import pyarrow.parquet
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.path = path
+        self.rows_per_part = rows_per_part
+        self.part_seconds = part_seconds
+        self.schema = pyarrow.schema([
+            (column, pyarrow.bool_() if column in BOOL_COLUMNS
+             else pyarrow.float64() if column in FLOAT_COLUMNS else pyarrow.string())
+            for column in COLUMNS
+        ])
+        self._rows = []
+        self._part_started = time.monotonic()
+
+    def _parts(self) -> list:
+        return sorted(name for name in os.listdir(self.path) if name.endswith('.parquet'))
+
+    def done_paths(self) -> set:
+        if not os.path.isdir(self.path):
+            return set()
+        done = set()
+        for name in self._parts():
+            done.update(self.pq.read_table(os.path.join(self.path, name), columns=['path']).column('path').to_pylist())
+        return done
+
+    def open(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._next_part = len(self._parts())
+
+    def write(self, rows: list):
+        self._rows.extend(rows)
+        if (len(self._rows) >= self.rows_per_part
+                or time.monotonic() - self._part_started >= self.part_seconds):
+            self._flush()
+
+    def _flush(self):
+        self._part_started = time.monotonic()
+        if not self._rows:
+            return
+        table = self.pa.Table.from_pylist(self._rows, schema=self.schema)
+        final = os.path.join(self.path, f"part-{self._next_part:05d}.parquet")
+        # Write-then-rename: a crash never leaves a truncated part behind
+        self.pq.write_table(table, final + '.tmp')
+        os.replace(final + '.tmp', final)
+        self._next_part += 1
+        self._rows = []
+
+    def close(self):
+        self._flush()
+
+
+def score_batch(engine, paths: list, tensor: np.ndarray, species_labels, disease_labels,
+                low_confidence: float) -> list:
+    species_probs, disease_probs = engine.infer_batch(tensor)
+    rows = []
+    for path, species_row, disease_row in zip(paths, species_probs, disease_probs):
+        species_name, species_confidence = top_prediction(species_row, species_labels, 'Unknown_Species')
+        disease_name, disease_confidence = top_prediction(disease_row, disease_labels, 'Unknown_Disease')
+        analysis = create_dual_model_analysis(species_name, species_confidence, disease_name, disease_confidence)
+        rows.append({
+            'path': path,
+            'plant_name': analysis['plantName'],
+            'species_label': species_name,
+            'disease_label': disease_name,
+            'disease_detected': analysis['diseaseDetected'],
+            'disease_name': analysis['diseaseName'],
+            'confidence': analysis['confidence'],
+            'species_confidence': analysis['speciesConfidence'],
+            'disease_confidence': analysis['diseaseConfidence'],
+            'severity': analysis['severity'],
+            'health_score': analysis['healthScore'],
+            # Images /predict would have sent to AI takeover
+            'low_confidence': analysis['confidence'] < low_confidence,
+            'error': None,
+        })
+    return rows
+
+
+def error_row(path: str, error: str) -> dict:
+    return {**{column: None for column in COLUMNS}, 'path': path, 'error': error}
+
+
+def peak_rss_mb() -> tuple:
+    """Peak resident memory (MB) of this process and of the largest decode worker."""
+    parent = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return parent / 1024, children / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input-dir', required=True, help='Folder of images (searched recursively)')
+    parser.add_argument('--output', required=True, help='Results: .csv file or .parquet dataset directory')
+    parser.add_argument('--backend', choices=INFERENCE_BACKENDS, default=os.getenv('INFERENCE_BACKEND', 'keras'))
+    parser.add_argument('--model', default=os.path.join(ROOT, 'final_plant_code', 'new_efficientnetb0_disease_detector.keras'))
+    parser.add_argument('--species-model', default=os.path.join(ROOT, 'final_plant_code', 'efficientnetb0_plant_species.h5'))
+    parser.add_argument('--threads', type=int, default=None, help='TFLite/ONNX Runtime threads')
+    parser.add_argument('--batch-size', type=int, default=32, help='Images per model call')
+    parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1), help='Decode processes')
+    parser.add_argument('--prefetch', type=int, default=None, help='Decoded batches in flight (default 2 x workers)')
+    parser.add_argument('--full-decode', action='store_true', help='Full-resolution decode (FAST_IMAGE_DECODE=false)')
+    parser.add_argument('--low-confidence', type=float, default=float(os.getenv('AI_FALLBACK_THRESHOLD', '50')),
+                        help='Flag rows below this combined confidence (the AI takeover threshold)')
+    parser.add_argument('--rows-per-part', type=int, default=10000, help='Rows per Parquet part file')
+    parser.add_argument('--part-seconds', type=float, default=60.0,
+                        help='Write a smaller Parquet part if this long has passed since the last one')
+    parser.add_argument('--report-every', type=float, default=10.0, help='Seconds between progress lines')
+    args = parser.parse_args()
+    prefetch = args.prefetch or 2 * args.workers
+
+    if args.output.endswith('.parquet'):
+        try:
+            sink = ParquetSink(args.output, args.rows_per_part, args.part_seconds)
+        except ImportError:
+            sys.exit("❌ Parquet output needs pyarrow (pip install pyarrow)")
+    else:
+        sink = CsvSink(args.output)
+    done = sink.done_paths()
+    if done:
+        print(f"♻️ Resuming: {len(done):,} images already in {args.output}")
+    todo = (path for path in walk_images(args.input_dir) if path not in done)
+    batches = iter(lambda: list(islice(todo, args.batch_size)), [])
+
+    species_labels = load_labels(os.path.join(ROOT, 'final_plant_code', 'species_labels.json'), 'species')
+    disease_labels = load_labels(os.path.join(ROOT, 'final_plant_code', 'disease_labels.json'), 'disease')
+
+    # Spawned (not forked) workers: the parent is about to load TensorFlow / ONNX Runtime
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn'))
+    pending = deque(pool.submit(decode_batch, args.input_dir, batch, not args.full_decode)
+                    for batch in islice(batches, prefetch))
+
+    engine = create_engine(args.backend, args.model, species_model_path=args.species_model,
+                           mode=os.getenv('INFERENCE_MODE', 'function'), num_threads=args.threads,
+                           max_batch_size=args.batch_size)
+    engine.load()
+    engine.warmup(args.batch_size)
+    print(f"🚀 {args.backend} engine, batches of {args.batch_size}, {args.workers} decode workers, "
+          f"{prefetch} batches prefetched")
+
+    scanned = errors = 0
+    decode_wait = infer_time = 0.0
+    started = last_report = time.perf_counter()
+    sink.open()
+    try:
+        while pending:
+            wait_start = time.perf_counter()
+            paths, tensor, failed = pending.popleft().result()
+            decode_wait += time.perf_counter() - wait_start
+            # Refill before running the model so decoding overlaps inference
+            for batch in islice(batches, 1):
+                pending.append(pool.submit(decode_batch, args.input_dir, batch, not args.full_decode))
+
+            rows = [error_row(path, error) for path, error in failed]
+            if tensor is not None:
+                infer_start = time.perf_counter()
+                rows += score_batch(engine, paths, tensor, species_labels, disease_labels, args.low_confidence)
+                infer_time += time.perf_counter() - infer_start
+            sink.write(rows)
+            scanned += len(rows)
+            errors += len(failed)
+
+            now = time.perf_counter()
+            if now - last_report >= args.report_every:
+                print(f"  {scanned:,} images  {scanned / (now - started):.1f} img/s  ({errors} errors)")
+                last_report = now
+    except KeyboardInterrupt:
+        print("\n⏸ Interrupted - finished batches are saved; re-run to resume")
+    finally:
+        sink.close()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    parent_mb, worker_mb = peak_rss_mb()
+    print(f"\n✅ {scanned:,} images in {elapsed:.1f}s ({scanned / elapsed if elapsed else 0:.1f} img/s), "
+          f"{errors} unreadable")
+    print(f"   waiting on decode {decode_wait:.1f}s, inference {infer_time:.1f}s")
+    print(f"   peak RSS: {parent_mb:.0f} MB (main), {worker_mb:.0f} MB (largest decode worker)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Accuracy-vs-latency report for the Keras, TFLite and ONNX inference backends.
+
+Expects a labeled folder laid out like the training data: one sub-folder per
+class, named exactly as in ``species_labels.json`` or ``disease_labels.json``.
+Every backend scores every image; the report lists top-1 accuracy, agreement
+with the Keras float32 reference, per-image latency and model size. Without
+TensorFlow installed the Keras reference is skipped and agreement is measured
+against the first TFLite/ONNX model instead.
+
+Usage:
+    python tools/compare_backends.py --data-dir test_dataset/ --head disease \\
+        --tflite final_plant_code/plant_multi_head_dynamic.tflite final_plant_code/plant_multi_head_int8.tflite \\
+        --onnx final_plant_code/plant_multi_head.onnx
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference_engine import create_engine  # noqa: E402
+from preprocessing import list_images, preprocess_image  # noqa: E402
+
+
+def evaluate(engine, samples: list, head: int) -> dict:
+    """Score ``samples`` one image at a time, as /predict does."""
+    predictions, latencies = [], []
+    for tensor, _ in samples:
+        start = time.perf_counter()
+        outputs = engine.infer_batch(tensor)
+        latencies.append((time.perf_counter() - start) * 1000)
+        predictions.append(int(np.argmax(outputs[head][0])))
+    latencies.sort()
+    return {
+        'predictions': predictions,
+        'accuracy': float(np.mean([p == label for p, (_, label) in zip(predictions, samples)])),
+        'latency_ms_mean': float(np.mean(latencies)),
+        'latency_ms_p95': float(latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data-dir', required=True, help='Labeled folder: <data-dir>/<class name>/<image>')
+    parser.add_argument('--head', choices=['species', 'disease'], default='disease')
+    parser.add_argument('--model', default=os.path.join(ROOT, 'final_plant_code', 'new_efficientnetb0_disease_detector.keras'))
+    parser.add_argument('--species-model', default=os.path.join(ROOT, 'final_plant_code', 'efficientnetb0_plant_species.h5'))
+    parser.add_argument('--tflite', nargs='*', default=[], help='TFLite models to compare')
+    parser.add_argument('--onnx', nargs='*', default=[], help='ONNX models to compare')
+    parser.add_argument('--threads', type=int, default=None, help='TFLite/ONNX Runtime threads')
+    parser.add_argument('--json', help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    labels_path = os.path.join(ROOT, 'final_plant_code', f'{args.head}_labels.json')
+    with open(labels_path, 'r', encoding='utf-8') as f:
+        labels = json.load(f)
+    head = 0 if args.head == 'species' else 1
+
+    samples = []
+    for path in list_images(args.data_dir):
+        class_name = os.path.basename(os.path.dirname(path))
+        if class_name not in labels:
+            continue
+        with open(path, 'rb') as f:
+            samples.append((preprocess_image(f.read()), labels.index(class_name)))
+    if not samples:
+        sys.exit(f"❌ No images in {args.data_dir} match {args.head} labels")
+    print(f"📂 {len(samples)} labeled images ({args.head} head)\n")
+
+    backends = {}
+    if importlib.util.find_spec('tensorflow') is not None:
+        backends['keras'] = create_engine('keras', args.model, species_model_path=args.species_model)
+    else:
+        print("ℹ️ TensorFlow is not installed - skipping the Keras reference\n")
+    for backend in ('tflite', 'onnx'):
+        for path in getattr(args, backend):
+            # Scored one image at a time, so TFLite needs no larger batch buckets
+            backends[os.path.basename(path)] = create_engine(backend, path, num_threads=args.threads,
+                                                             max_batch_size=1)
+    if not backends:
+        sys.exit("❌ Nothing to compare: pass --tflite and/or --onnx models")
+
+    report = {}
+    reference = None
+    for name, engine in backends.items():
+        engine.load()
+        engine.warmup()
+        result = evaluate(engine, samples, head)
+        if reference is None:
+            reference = result['predictions']
+        result['agreement'] = float(np.mean([a == b for a, b in zip(result.pop('predictions'), reference)]))
+        result['size_mb'] = os.path.getsize(engine.model_path) / 1e6 if os.path.isfile(engine.model_path) else None
+        report[name] = result
+
+    print(f"{'backend':<36} {'top-1':>7} {'agree':>7} {'mean ms':>9} {'p95 ms':>9} {'MB':>7}")
+    for name, r in report.items():
+        size = f"{r['size_mb']:.1f}" if r['size_mb'] is not None else '-'
+        print(f"{name:<36} {r['accuracy']:>7.2%} {r['agreement']:>7.2%} "
+              f"{r['latency_ms_mean']:>9.2f} {r['latency_ms_p95']:>9.2f} {size:>7}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
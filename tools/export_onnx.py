@@ -0,0 +1,64 @@
+"""Convert the shipped Keras model to ONNX for the ONNX Runtime backend.
+
+Exports the same multi-head graph the Keras engine serves (disease model plus
+grafted species head when the species model is present) with a dynamic batch
+dimension, then checks the ONNX outputs against Keras on a random batch and
+writes a ``.json`` sidecar with the species/disease output order.
+
+Requires ``tf2onnx`` and ``onnxruntime`` (export only; the server needs just
+``onnxruntime``).
+
+Usage:
+    python tools/export_onnx.py --output final_plant_code/plant_multi_head.onnx
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference_engine import INPUT_SHAPE  # noqa: E402
+from keras_engine import KerasEngine  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(ROOT, 'final_plant_code', 'new_efficientnetb0_disease_detector.keras'))
+    parser.add_argument('--species-model', default=os.path.join(ROOT, 'final_plant_code', 'efficientnetb0_plant_species.h5'))
+    parser.add_argument('--output', default=os.path.join(ROOT, 'final_plant_code', 'plant_multi_head.onnx'))
+    parser.add_argument('--opset', type=int, default=13)
+    args = parser.parse_args()
+
+    import onnxruntime as ort
+    import tf2onnx
+
+    engine = KerasEngine(args.model, args.species_model, mode='predict')
+    engine.load()
+    signature = [tf.TensorSpec((None,) + INPUT_SHAPE, tf.float32, name='images')]
+    tf2onnx.convert.from_keras(engine.model, input_signature=signature, opset=args.opset, output_path=args.output)
+    print(f"✓ Wrote {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+    # Verify against Keras and record which ONNX output is which head
+    sample = np.random.uniform(0, 255, size=(4,) + INPUT_SHAPE).astype(np.float32)
+    expected = engine.infer_batch(sample)
+    session = ort.InferenceSession(args.output, providers=['CPUExecutionProvider'])
+    outputs = session.run(None, {session.get_inputs()[0].name: sample})
+
+    order = {}
+    for head, reference in zip(('species', 'disease'), expected):
+        candidates = [i for i, out in enumerate(outputs) if out.shape == reference.shape]
+        order[head] = min(candidates, key=lambda i: float(np.abs(outputs[i] - reference).sum()))
+        max_diff = float(np.abs(outputs[order[head]] - reference).max())
+        print(f"  {head:<8} output #{order[head]}  max |onnx - keras| = {max_diff:.2e}")
+
+    with open(os.path.splitext(args.output)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump({'opset': args.opset, 'output_order': order}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
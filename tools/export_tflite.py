@@ -0,0 +1,121 @@
+"""Export the plant model to TFLite with dynamic-range and full-INT8 quantization.
+
+The Keras engine (disease model plus grafted species head when available) is
+converted twice:
+
+* ``<name>_dynamic.tflite`` - int8 weights, float activations; no calibration
+* ``<name>_int8.tflite``   - int8 weights and activations, calibrated on a
+  sample image folder through the same ``preprocess_image`` the server uses
+
+Each file gets a ``.json`` sidecar recording which interpreter output is the
+species head and which the disease head, read back by ``TFLiteEngine``.
+
+Usage:
+    python tools/export_tflite.py --calibration-dir samples/ --num-calibration 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+import numpy as np
+import tensorflow as tf
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from inference_engine import INPUT_SHAPE  # noqa: E402
+from keras_engine import KerasEngine  # noqa: E402
+from preprocessing import list_images, preprocess_image  # noqa: E402
+
+
+def representative_dataset(paths: list):
+    """Yield preprocessed calibration samples, one image at a time."""
+    def generator():
+        for path in paths:
+            with open(path, 'rb') as f:
+                try:
+                    yield [preprocess_image(f.read())]
+                except Exception as e:
+                    print(f"⚠ Skipping {path}: {e}")
+    return generator
+
+
+def output_order(tflite_path: str, keras_model: tf.keras.Model) -> dict:
+    """Match interpreter outputs to the Keras heads by comparing on a random input."""
+    sample = np.random.uniform(0, 255, size=(1,) + INPUT_SHAPE).astype(np.float32)
+    expected = keras_model(sample, training=False)
+    if not isinstance(expected, (list, tuple)):
+        return {'species': 0, 'disease': 0}
+
+    interpreter = tf.lite.Interpreter(model_path=tflite_path)
+    interpreter.allocate_tensors()
+    inp = interpreter.get_input_details()[0]
+    if inp['dtype'] != np.float32:
+        scale, zero_point = inp['quantization']
+        info = np.iinfo(inp['dtype'])
+        sample = np.clip(np.round(sample / scale + zero_point), info.min, info.max).astype(inp['dtype'])
+    interpreter.set_tensor(inp['index'], sample)
+    interpreter.invoke()
+
+    order = {}
+    outputs = interpreter.get_output_details()
+    for head, reference in zip(('species', 'disease'), expected):
+        reference = np.asarray(reference)
+        candidates = [i for i, d in enumerate(outputs) if d['shape'][-1] == reference.shape[-1]]
+        order[head] = min(
+            candidates,
+            key=lambda i: float(np.abs(interpreter.get_tensor(outputs[i]['index']).astype(np.float32) - reference).sum())
+        )
+    return order
+
+
+def convert(model: tf.keras.Model, path: str, calibration: list = None):
+    """Convert ``model`` to TFLite at ``path``; full INT8 when calibration images are given."""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if calibration:
+        converter.representative_dataset = representative_dataset(calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+
+    with open(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'quantization': 'int8' if calibration else 'dynamic',
+            'calibration_images': len(calibration) if calibration else 0,
+            'output_order': output_order(path, model),
+        }, f, indent=2)
+    print(f"✓ Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=os.path.join(ROOT, 'final_plant_code', 'new_efficientnetb0_disease_detector.keras'))
+    parser.add_argument('--species-model', default=os.path.join(ROOT, 'final_plant_code', 'efficientnetb0_plant_species.h5'))
+    parser.add_argument('--output-dir', default=os.path.join(ROOT, 'final_plant_code'))
+    parser.add_argument('--name', default='plant_multi_head')
+    parser.add_argument('--calibration-dir', help='Folder of sample images for INT8 calibration')
+    parser.add_argument('--num-calibration', type=int, default=200)
+    args = parser.parse_args()
+
+    engine = KerasEngine(args.model, args.species_model, mode='predict')
+    engine.load()
+    model = engine.model
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    convert(model, os.path.join(args.output_dir, f'{args.name}_dynamic.tflite'))
+
+    if not args.calibration_dir:
+        print("ℹ️ No --calibration-dir given; skipping full-INT8 export")
+        return
+    images = list_images(args.calibration_dir)
+    if not images:
+        sys.exit(f"❌ No images found in {args.calibration_dir}")
+    random.Random(0).shuffle(images)
+    convert(model, os.path.join(args.output_dir, f'{args.name}_int8.tflite'), images[:args.num_calibration])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Move legacy base64 data-URL images out of ``plant_analyses`` into the blob store.
+
+Rows written before the blob store keep the whole photo in ``image_url`` as
+``data:image/...;base64,...``. This decodes each one, stores it (and a
+thumbnail) exactly like /predict now does, and rewrites the row with the blob
+URL, so history queries stop returning megabytes per row. Rows are processed
+in pages and already-migrated rows are skipped, so the script can be re-run.
+
+Uses the same BLOB_* and SUPABASE_* environment variables as the server.
+
+Usage:
+    python tools/migrate_image_urls.py --dry-run
+    python tools/migrate_image_urls.py --page-size 50
+"""
+import argparse
+import base64
+import os
+import sys
+
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from blob_store import create_blob_store, save_image  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=25, help='Rows fetched per query (each row is a full image)')
+    parser.add_argument('--dry-run', action='store_true', help='Count legacy rows without changing anything')
+    args = parser.parse_args()
+
+    load_dotenv(os.path.join(ROOT, '.env'))
+    from supabase import create_client
+    client = create_client(os.environ['SUPABASE_URL'], os.environ['SUPABASE_SERVICE_KEY'])
+    store = create_blob_store(
+        os.getenv('BLOB_BACKEND', 'local').lower(),
+        os.getenv('BLOB_DIR', os.path.join(ROOT, 'blobs')),
+        os.getenv('BLOB_BASE_URL', '/blobs'),
+        client,
+        os.getenv('BLOB_BUCKET', 'plant-images')
+    )
+    thumbnail_edge = int(os.getenv('BLOB_THUMBNAIL_EDGE', '256'))
+
+    migrated, failed, bytes_before, bytes_after = 0, 0, 0, 0
+    last_id = None
+    while True:
+        query = client.table('plant_analyses').select('id, image_url, analysis_data') \
+            .like('image_url', 'data:%').order('id').limit(args.page_size)
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.execute().data or []
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        for row in rows:
+            bytes_before += len(row['image_url'])
+            if args.dry_run:
+                migrated += 1
+                continue
+            try:
+                image_bytes = base64.b64decode(row['image_url'].split(',', 1)[1])
+                image = save_image(store, image_bytes, thumbnail_edge)
+            except Exception as e:
+                failed += 1
+                print(f"  {row['id']}: skipped ({e})")
+                continue
+            analysis_data = {**(row.get('analysis_data') or {}),
+                             'imageKey': image['key'], 'thumbnailUrl': image['thumbnail_url']}
+            client.table('plant_analyses').update({
+                'image_url': image['image_url'],
+                'thumbnail_url': image['thumbnail_url'],
+                'analysis_data': analysis_data
+            }).eq('id', row['id']).execute()
+            bytes_after += len(image['image_url'])
+            migrated += 1
+        print(f"{migrated} rows {'found' if args.dry_run else 'migrated'}, {failed} failed")
+
+    print(f"\nimage_url column: {bytes_before / 1024 / 1024:.1f} MB of data URLs"
+          + ('' if args.dry_run else f" -> {bytes_after / 1024:.1f} KB of blob URLs"))
+    print(f"Blob store: {store.stats()}")
+
+
+if __name__ == '__main__':
+    main()
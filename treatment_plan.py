@@ -0,0 +1,87 @@
+"""Incremental parser for Gemini treatment plans.
+
+The treatment-plan prompt asks for a fixed layout of headed sections
+(``DAY 0 - IMMEDIATE ACTION:`` followed by ``-action`` lines, then one-line
+``WATERING TIP: ...`` style tips). ``PlanSectionParser`` consumes the reply as
+it streams in and hands back each section as a structured event as soon as
+the next heading shows it is complete, so the first day's actions can be
+rendered long before the whole plan has been generated.
+"""
+import re
+from typing import List, Optional
+
+# An upper-case heading ending in a colon, optionally wrapped in markdown
+# emphasis and optionally followed by inline text ("WATERING TIP: ...")
+_HEADING = re.compile(r'^[*#\s]*([A-Z][A-Z0-9 +\-]*?)\s*:\**\s*(.*)$')
+_DAY = re.compile(r'^DAY\s+(\d+)')
+_BULLET = re.compile(r'^\s*(?:[-•*]+|\d+[.)])\s*')
+
+MAX_ACTIONS = 6
+
+
+def section_key(heading: str) -> str:
+    """``'DAY 1-3 - INITIAL TREATMENT'`` -> ``'day_1_3_initial_treatment'``."""
+    return re.sub(r'[^a-z0-9]+', '_', heading.lower()).strip('_')
+
+
+class PlanSectionParser:
+    """Turns streamed plan text into ``section`` and ``tip`` events."""
+
+    def __init__(self):
+        self._buffer = ''
+        self._heading: Optional[str] = None
+        self._inline = ''
+        self._lines: List[str] = []
+
+    def feed(self, text: str) -> List[dict]:
+        """Add a chunk of text; return the sections it completed."""
+        self._buffer += text
+        events = []
+        *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            events.extend(self._line(line))
+        return events
+
+    def finish(self) -> List[dict]:
+        """Flush whatever is left once the stream has ended."""
+        events = self._line(self._buffer) if self._buffer else []
+        self._buffer = ''
+        event = self._close()
+        return events + ([event] if event else [])
+
+    def _line(self, line: str) -> List[dict]:
+        match = _HEADING.match(line)
+        if match:
+            event = self._close()
+            self._heading, self._inline = match.group(1).strip(), match.group(2).strip(' *')
+            return [event] if event else []
+        if self._heading is not None and line.strip():
+            self._lines.append(line.strip())
+        return []
+
+    def _close(self) -> Optional[dict]:
+        heading, inline, lines = self._heading, self._inline, self._lines
+        self._heading, self._inline, self._lines = None, '', []
+        if heading is None:
+            return None
+
+        if inline:
+            return {
+                'type': 'tip',
+                'key': section_key(heading),
+                'heading': heading,
+                'text': ' '.join([inline] + lines),
+            }
+
+        actions = [_BULLET.sub('', line).replace('**', '').strip() for line in lines]
+        event = {
+            'type': 'section',
+            'key': section_key(heading),
+            'heading': heading,
+            'title': heading.split(' - ', 1)[-1].title(),
+            'actions': [a for a in actions if a][:MAX_ACTIONS],
+        }
+        day = _DAY.match(heading)
+        if day:
+            event['day'] = int(day.group(1))
+        return event
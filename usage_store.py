@@ -0,0 +1,248 @@
+"""Usage counters shared by every server worker process.
+
+Each worker keeps counting into its own ``USAGE_STATS`` dict. That dict is
+only touched on the event loop thread, so it needs no lock. Every
+``flush_interval`` seconds the store adds what changed since the last flush
+to a local SQLite file. The write is one ``INSERT ... ON CONFLICT DO UPDATE
+SET value = value + ?`` transaction, so concurrent workers never lose an
+increment. Counters are kept twice: under ``lifetime`` and under the
+worker's own id.
+
+Reads aggregate across workers:
+
+* lifetime   - the ``lifetime`` rows
+* session    - the sum over workers that flushed recently (i.e. are running);
+  the session started when the oldest of them did
+
+After every flush the aggregate is also written to ``usage_stats.json``,
+to a temporary file that is then renamed over the old one. A crash never
+leaves a half-written file, and loses at most one interval of counts. On
+first start, the lifetime totals of an existing ``usage_stats.json`` (the
+old per-process format) are imported once.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UsageStatsStore:
+    """Periodically merges a worker's ``stats`` dict into a shared SQLite file."""
+
+    def __init__(self, path: str, stats: dict, json_path: Optional[str] = None,
+                 flush_interval: float = 10.0, live_after: Optional[float] = None):
+        self.path = path
+        self.stats = stats
+        self.json_path = json_path
+        self.flush_interval = max(0.5, float(flush_interval))
+        # A worker that has not flushed for this long no longer counts towards the session
+        self.live_after = live_after or max(60.0, 3 * self.flush_interval)
+        self.counters = [key for key, value in stats.items() if isinstance(value, int)]
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        # sqlite3 connections are single-threaded; one worker serialises access
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='usage-stats')
+        self._conn: Optional[sqlite3.Connection] = None
+        self._flushed = {key: 0 for key in self.counters}
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_snapshot: Optional[dict] = None
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS usage_counters ('
+                     ' scope TEXT NOT NULL, key TEXT NOT NULL, value INTEGER NOT NULL DEFAULT 0,'
+                     ' PRIMARY KEY (scope, key))')
+        conn.execute('CREATE TABLE IF NOT EXISTS usage_workers ('
+                     ' worker TEXT PRIMARY KEY, pid INTEGER, started_at TEXT NOT NULL, last_seen REAL NOT NULL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS usage_meta (key TEXT PRIMARY KEY, value TEXT)')
+        return conn
+
+    def _import_legacy_json(self):
+        """Seed lifetime totals from an existing usage_stats.json, once per database."""
+        if not self.json_path or not os.path.exists(self.json_path):
+            return
+        try:
+            with open(self.json_path, 'r', encoding='utf-8') as f:
+                lifetime = json.load(f).get('total_lifetime') or {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠ Could not read {self.json_path}: {e}")
+            return
+        conn = self._conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            claimed = conn.execute("INSERT OR IGNORE INTO usage_meta (key, value) VALUES ('imported_json', ?)",
+                                   (datetime.now().isoformat(),)).rowcount
+            if claimed:
+                self._add(conn, 'lifetime', {key: int(lifetime.get(key, 0)) for key in self.counters})
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        if claimed:
+            logger.info(f"📊 Imported lifetime stats from {self.json_path}: {lifetime.get('predictions', 0)} predictions")
+
+    @staticmethod
+    def _add(conn: sqlite3.Connection, scope: str, deltas: dict):
+        conn.executemany(
+            'INSERT INTO usage_counters (scope, key, value) VALUES (?, ?, ?)'
+            ' ON CONFLICT (scope, key) DO UPDATE SET value = value + excluded.value',
+            [(scope, key, value) for key, value in deltas.items() if value]
+        )
+
+    def _open(self, started_at: str):
+        self._conn = self._connect()
+        self._import_legacy_json()
+        self._conn.execute('INSERT OR REPLACE INTO usage_workers (worker, pid, started_at, last_seen) VALUES (?, ?, ?, ?)',
+                           (self.worker_id, os.getpid(), started_at, time.time()))
+
+    def _write(self, deltas: dict, started_at: str) -> dict:
+        """Add ``deltas`` to the lifetime and worker counters in one transaction; return the aggregate."""
+        conn = self._conn
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._add(conn, 'lifetime', deltas)
+            self._add(conn, self.worker_id, deltas)
+            # Re-register if another worker pruned us after a long stall
+            conn.execute('INSERT INTO usage_workers (worker, pid, started_at, last_seen) VALUES (?, ?, ?, ?)'
+                         ' ON CONFLICT (worker) DO UPDATE SET last_seen = excluded.last_seen',
+                         (self.worker_id, os.getpid(), started_at, now))
+            # Workers that stopped without closing: their counts are already in lifetime
+            stale = [row[0] for row in conn.execute('SELECT worker FROM usage_workers WHERE last_seen < ?',
+                                                    (now - self.live_after,))]
+            for worker in stale:
+                conn.execute('DELETE FROM usage_counters WHERE scope = ?', (worker,))
+                conn.execute('DELETE FROM usage_workers WHERE worker = ?', (worker,))
+            # Read inside the transaction so the aggregate is consistent
+            snapshot = self._read(now)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._write_json(snapshot)
+        return snapshot
+
+    def _read(self, now: float) -> dict:
+        conn = self._conn
+        lifetime = dict(conn.execute("SELECT key, value FROM usage_counters WHERE scope = 'lifetime'").fetchall())
+        live = 'SELECT worker FROM usage_workers WHERE last_seen >= ?'
+        session = dict(conn.execute(f'SELECT key, SUM(value) FROM usage_counters WHERE scope IN ({live}) GROUP BY key',
+                                    (now - self.live_after,)).fetchall())
+        workers, start_time = conn.execute('SELECT COUNT(*), MIN(started_at) FROM usage_workers WHERE last_seen >= ?',
+                                           (now - self.live_after,)).fetchone()
+        return {
+            **{key: session.get(key, 0) for key in self.counters},
+            'start_time': start_time,
+            'workers': workers,
+            'total_lifetime': {key: lifetime.get(key, 0) for key in self.counters},
+        }
+
+    def _write_json(self, snapshot: dict):
+        if not self.json_path:
+            return
+        # Per-process temp name: concurrent workers never write the same file
+        tmp_path = f"{self.json_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.json_path)
+        except OSError as e:
+            logger.warning(f"⚠ Could not write {self.json_path}: {e}")
+
+    def _close(self, deltas: dict, started_at: str):
+        self._write(deltas, started_at)
+        # This worker's session counts leave the aggregate with it
+        self._conn.execute('BEGIN IMMEDIATE')
+        self._conn.execute('DELETE FROM usage_counters WHERE scope = ?', (self.worker_id,))
+        self._conn.execute('DELETE FROM usage_workers WHERE worker = ?', (self.worker_id,))
+        self._conn.execute('COMMIT')
+        self._write_json(self._read(time.time()))
+        self._conn.close()
+        self._conn = None
+
+    async def _run_locked(self, fn) -> dict:
+        """Run ``fn(deltas, started_at)`` on the store thread; deltas are taken on the event loop."""
+        async with self._lock:
+            current = {key: self.stats[key] for key in self.counters}
+            deltas = {key: current[key] - self._flushed[key] for key in self.counters}
+            started_at = self.stats.get('start_time') or datetime.now().isoformat()
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, deltas, started_at)
+            self._flushed = current
+            return result
+
+    def start(self):
+        """Open the database, register this worker and start the periodic flush.
+
+        Call from the event loop (the FastAPI startup hook) after ``stats['start_time']`` is set.
+        """
+        self._open(self.stats.get('start_time') or datetime.now().isoformat())
+        self._lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._periodic_flush())
+
+    async def _periodic_flush(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded: a flush already handed to the store thread must finish bookkeeping
+            await asyncio.shield(self.flush())
+
+    async def flush(self) -> Optional[dict]:
+        """Merge counts since the last flush; returns the aggregate (None on failure, retried next time)."""
+        if self._conn is None:
+            return None
+        try:
+            self._last_snapshot = await self._run_locked(self._write)
+            self.flushes += 1
+            return self._last_snapshot
+        except Exception as e:
+            self.failed_flushes += 1
+            logger.warning(f"⚠ Usage stats flush failed: {e}")
+            return None
+
+    async def snapshot(self) -> dict:
+        """Counters across all running workers plus lifetime totals, in the ``stats`` dict layout."""
+        snapshot = await self.flush() or self._last_snapshot
+        if snapshot is None:
+            # Store unavailable: this worker's own view is the best we have
+            local = {key: self.stats[key] for key in self.counters}
+            snapshot = {**local, 'start_time': self.stats.get('start_time'), 'workers': 1,
+                        'total_lifetime': dict(local)}
+        return snapshot
+
+    async def aclose(self):
+        """Final flush, then drop this worker from the session aggregate."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._conn is not None:
+            try:
+                await self._run_locked(self._close)
+            except Exception as e:
+                logger.warning(f"⚠ Final usage stats flush failed: {e}")
+        self._executor.shutdown(wait=False)
+
+    def info(self) -> dict:
+        return {
+            'path': self.path,
+            'worker': self.worker_id,
+            'flush_interval_seconds': self.flush_interval,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+        }
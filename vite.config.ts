@@ -7,6 +7,10 @@ export default defineConfig(({ mode }) => ({
   server: {
     host: "::",
     port: 8080,
+    // Local blob URLs are stored relative (BLOB_BASE_URL=/blobs)
+    proxy: {
+      "/blobs": "http://localhost:8000",
+    },
   },
   plugins: [
     react(),
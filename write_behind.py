@@ -0,0 +1,227 @@
+"""Write-behind queue for database inserts.
+
+/predict used to await a synchronous Supabase ``insert().execute()`` (a full
+network round trip on the event loop) before returning. Records are now
+queued in memory and a background task inserts them in batches, once either
+``max_batch_size`` rows are waiting or the oldest has waited
+``flush_interval_ms``. Failed batches are retried with exponential backoff.
+
+Rows that still cannot be written (retries exhausted, queue overflow, or
+pending at shutdown) are appended to a JSON-lines spill file, which is
+reloaded and retried the next time the queue starts.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Awaitable, Callable, List, Optional, Union
+
+from latency import percentile_summary
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindQueue:
+    """Batches records for ``flush_fn(records)`` off the request path.
+
+    ``flush_fn`` may be a coroutine function; a plain (blocking) function is
+    run in ``executor``.
+    """
+
+    def __init__(self, name: str, flush_fn: Callable[[List[dict]], Union[None, Awaitable[None]]],
+                 max_batch_size: int = 50, flush_interval_ms: float = 1000.0,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 spill_path: Optional[str] = None, max_pending: int = 10000,
+                 executor: Optional[Executor] = None, latency_window: int = 1000):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.flush_interval = max(0.0, float(flush_interval_ms)) / 1000
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.spill_path = spill_path
+        self.max_pending = max_pending
+        self.executor = executor
+        self._pending: deque = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Batch taken off the queue by the flush task and not yet written or spilled
+        self._in_flight: Optional[list] = None
+        self._spill_lock = threading.Lock()
+        # Records refused by a full queue, written out together by one spill task
+        self._overflow: list = []
+        self._overflow_task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.enqueued = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_attempts = 0
+        self.spilled = 0
+        self.reloaded = 0
+        self._flush_ms = deque(maxlen=latency_window)
+        self._lag_ms = deque(maxlen=latency_window)
+
+    def start(self):
+        """Start the flush task and re-queue anything spilled by a previous run."""
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._reload_spill()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    def put(self, record: dict):
+        """Queue one record; never blocks on the database."""
+        self.start()
+        self.enqueued += 1
+        if len(self._pending) >= self.max_pending:
+            if not self._overflow:
+                logger.warning(f"⚠ {self.name} write queue full ({self.max_pending}) - spilling to disk")
+            self._overflow.append(record)
+            if self._overflow_task is None or self._overflow_task.done():
+                self._overflow_task = asyncio.get_running_loop().create_task(self._spill_overflow())
+            return
+        self._pending.append((record, time.perf_counter()))
+        self._wakeup.set()
+
+    async def drain(self):
+        """Stop the background task and flush what is left (one attempt per batch).
+
+        Anything that still fails is spilled to disk for the next start. A batch
+        the flush task was still writing or backing off on goes back on the
+        queue first (it may be written twice if its insert was about to succeed).
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._in_flight:
+            self._pending.extendleft(reversed(self._in_flight))
+            self._in_flight = None
+        while self._pending:
+            await self._flush(self._take_batch(), retries=0)
+        if self._overflow_task is not None:
+            await self._overflow_task
+            self._overflow_task = None
+
+    def _take_batch(self) -> list:
+        return [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            # Let the batch fill until the oldest record has waited flush_interval
+            while len(self._pending) < self.max_batch_size:
+                remaining = self._pending[0][1] + self.flush_interval - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            self._in_flight = self._take_batch()
+            await self._flush(self._in_flight, self.max_retries)
+            self._in_flight = None
+
+    async def _flush(self, batch: list, retries: int):
+        records = [record for record, _ in batch]
+        loop = asyncio.get_running_loop()
+        for attempt in range(retries + 1):
+            started = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(self.flush_fn):
+                    await self.flush_fn(records)
+                else:
+                    await loop.run_in_executor(self.executor, self.flush_fn, records)
+            except Exception as e:
+                self.failed_attempts += 1
+                if attempt == retries:
+                    logger.error(f"❌ {self.name} batch of {len(records)} failed after {attempt + 1} attempts: {e}")
+                    break
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning(f"⚠ {self.name} batch of {len(records)} failed ({e}) - retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            finished = time.perf_counter()
+            self._flush_ms.append((finished - started) * 1000)
+            self._lag_ms.extend((finished - enqueued) * 1000 for _, enqueued in batch)
+            self.batches += 1
+            self.flushed += len(records)
+            logger.info(f"💾 {self.name}: {len(records)} rows written in {(finished - started) * 1000:.0f} ms")
+            return
+        if batch is self._in_flight:
+            # Handed to the spill file: drain() must not re-queue it
+            self._in_flight = None
+        await self._spill(records)
+
+    async def _spill_overflow(self):
+        # One fsync per accumulated group instead of one per refused request
+        while self._overflow:
+            records, self._overflow = self._overflow, []
+            try:
+                await self._spill(records)
+            except Exception as e:
+                logger.error(f"❌ {self.name}: could not spill {len(records)} overflow rows: {e}")
+
+    async def _spill(self, records: list):
+        # Blocking write + fsync: keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(self.executor, self._write_spill, records)
+
+    def _write_spill(self, records: list):
+        if not self.spill_path:
+            logger.error(f"❌ {self.name}: dropping {len(records)} rows (no spill file configured)")
+            return
+        with self._spill_lock:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.spilled += len(records)
+
+    def _reload_spill(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        # Move the file aside first so records spilled while retrying are kept apart
+        loading = self.spill_path + '.loading'
+        os.replace(self.spill_path, loading)
+        count = 0
+        with open(loading, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    self._pending.append((json.loads(line), time.perf_counter()))
+                    count += 1
+                except json.JSONDecodeError:
+                    logger.warning(f"⚠ {self.name}: skipping corrupt spill line")
+        os.remove(loading)
+        self.reloaded += count
+        if count:
+            logger.info(f"♻️ {self.name}: re-queued {count} rows from {self.spill_path}")
+            self._wakeup.set()
+
+    def stats(self) -> dict:
+        return {
+            'queue_depth': len(self._pending),
+            'max_batch_size': self.max_batch_size,
+            'flush_interval_ms': self.flush_interval * 1000,
+            'enqueued': self.enqueued,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'failed_attempts': self.failed_attempts,
+            'spilled': self.spilled,
+            'reloaded_from_spill': self.reloaded,
+            'flush_ms': percentile_summary(self._flush_ms),
+            'enqueue_to_write_ms': percentile_summary(self._lag_ms),
+        }